@@ -0,0 +1,116 @@
+"""Polling engine scalability: many sessions against stand-in phones, and key latency next to hung phones.
+
+    python bench/engine_bench.py [--sessions 10,100,300] [--seconds 10] [--hung 10]
+
+"scale" polls N sessions (screenshot and LineInfo once a second each) against stand-ins served
+from other processes, and reports achieved polls/sec, client CPU and thread count, and key press latency.
+"hung" opens one healthy phone next to --hung phones that accept connections but never answer,
+and measures how long a key press on the healthy phone takes.
+"""
+import argparse, os, subprocess, sys, threading, time
+from standin import StandInPhone, HungPhone, percentile
+import cisco_session
+from cisco_session import PhoneSession, PhoneFleet
+from cisco_scheduler import AdaptiveRefresh
+from cisco_transport import HttpTransport
+
+# Quiet, in-memory sessions: no JSONL file, no on-disk frame history, no host-wide poll budget
+cisco_session._log_settings = {"verbosity": {"*": "warning", "cgi_resp": "info"}, "jsonl": False}
+PhoneSession.record_history = False
+PhoneSession.host_request_budget = 100000
+
+def open_session(fleet, port, interval=1.0):
+    session = PhoneSession("127.0.0.1", "8841", "local")
+    session.connect()
+    # Sessions always talk to port 80; point this one at the stand-in instead
+    session.transport.close()
+    session.transport = HttpTransport("127.0.0.1", session.CGI_USER, session.CGI_PASS, port=port,
+                                      timeout=session.request_timeout, connect_timeout=session.connect_timeout)
+    session.scheduler = AdaptiveRefresh(idle_interval=interval, max_interval=interval, burst_polls=0)
+    session.line_info_interval = interval
+    fleet.add(session)
+    return session
+
+def key_latency(session, presses=5, gap=0.3):
+    """Seconds from press() until the phone's Execute response is back, per press"""
+    answered = threading.Event()
+    session.on_log = lambda entry: answered.set() if entry.get("category") == "cgi_resp" else None
+    latencies = []
+    for _ in range(presses):
+        answered.clear()
+        start = time.perf_counter()
+        session.press("Key:Soft1")
+        if not answered.wait(30):
+            latencies.append(30.0)
+            continue
+        latencies.append(time.perf_counter() - start)
+        time.sleep(gap)
+    session.on_log = None
+    return latencies
+
+def spawn_standin():
+    proc = subprocess.Popen([sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "standin.py")],
+                            stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+    return proc, int(proc.stdout.readline())
+
+def scale(counts, seconds, per_server=75):
+    # A threaded Python stand-in tops out around 150 req/s, so large runs are spread over several
+    standins = [spawn_standin() for _ in range(max(1, max(counts) // per_server))]
+    try:
+        for count in counts:
+            fleet = PhoneFleet()
+            sessions = [open_session(fleet, standins[i % len(standins)][1]) for i in range(count)]
+            fleet.start_polling()
+            time.sleep(1)
+            start_fetches = sum(s.fetch_count for s in sessions)
+            start, start_cpu = time.perf_counter(), time.process_time()
+            keys = key_latency(sessions[0], presses=max(3, int(seconds / 0.5) // 2), gap=0.2)
+            time.sleep(max(0.0, seconds - (time.perf_counter() - start)))
+            elapsed = time.perf_counter() - start
+            cpu = (time.process_time() - start_cpu) / elapsed * 100
+            fetches = sum(s.fetch_count for s in sessions) - start_fetches
+            threads = threading.active_count()
+            fleet.close_all()
+            print(f"{count:5d} sessions  {fetches / elapsed:8.1f} screenshots/s  client CPU {cpu:5.1f}%  "
+                  f"{threads:4d} threads  key p50 {percentile(keys, 50) * 1000:7.1f} ms  p99 {percentile(keys, 99) * 1000:7.1f} ms")
+    finally:
+        for proc, _ in standins:
+            proc.stdin.close()
+            proc.wait()
+
+def hung(count):
+    phone = StandInPhone().start()
+    dead = [HungPhone().start() for _ in range(count)]
+    fleet = PhoneFleet()
+    try:
+        healthy = open_session(fleet, phone.port)
+        for d in dead:
+            open_session(fleet, d.port)
+        fleet.start_polling()
+        # Let every hung phone's first polls get stuck before pressing
+        time.sleep(1.5)
+        keys = key_latency(healthy)
+        shots = phone.hits["screenshot"]
+        time.sleep(3)
+        print(f"1 healthy + {count} hung phones: key p50 {percentile(keys, 50) * 1000:.1f} ms, max {max(keys) * 1000:.1f} ms; "
+              f"healthy phone screenshots in 3 s: {phone.hits['screenshot'] - shots}")
+    finally:
+        fleet.close_all()
+        phone.stop()
+        for d in dead:
+            d.stop()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", default="10,100,300", help="comma separated session counts for the scale run")
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--hung", type=int, default=10, help="hung phones next to the healthy one")
+    parser.add_argument("--only", choices=["scale", "hung"])
+    args = parser.parse_args()
+    if args.only != "hung":
+        scale([int(v) for v in args.sessions.split(",")], args.seconds)
+    if args.only != "scale":
+        hung(args.hung)
+
+if __name__ == "__main__":
+    main()
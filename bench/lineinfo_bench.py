@@ -0,0 +1,56 @@
+"""LineInfo parse time per model over the bench/samples/lineinfo_*.xml responses.
+
+"old" is the handler LineInfoParser replaced: decode to str, ElementTree.fromstring, then the
+LineIconState / CiscoIPPhoneLine / Line findall chain. "detect" is a fresh LineInfoParser,
+which collects every layout in its single pass and picks one (the first poll, or a poll after
+the cached layout came back empty); "cached" is a parser that has seen the phone before and
+only collects its layout.
+
+    python bench/lineinfo_bench.py [--polls 20000]
+"""
+import argparse, glob, os, time
+import xml.etree.ElementTree as ET
+import standin  # noqa: F401  (puts the repo root on sys.path)
+from cisco_lineinfo import LineInfoParser
+
+SAMPLES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "samples")
+
+def old_parse(data):
+    root = ET.fromstring(data.decode())
+    has_voicemail = any(mw.text == "YES" for mw in root.iter("MessageWaiting"))
+    states = [e.text for e in root.findall(".//LineIconState") if e.text]
+    for tag in ("CiscoIPPhoneLine", "Line"):
+        if states:
+            break
+        for line in root.findall(f".//{tag}"):
+            icon = line.find("LineIconState")
+            states.append(icon.text if icon is not None and icon.text else "UNKNOWN")
+    return has_voicemail, states
+
+def detect_parse(data):
+    # A fresh parser every time, so every call detects the layout again
+    return LineInfoParser().parse(data)
+
+def per_call_us(func, data, polls):
+    start = time.perf_counter()
+    for _ in range(polls):
+        func(data)
+    return (time.perf_counter() - start) / polls * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--polls", type=int, default=20000, help="parses per sample and variant")
+    args = parser.parse_args()
+    print(f"{'sample':<20} {'layout':<17} {'old':>9} {'detect':>9} {'cached':>9}  (per poll)")
+    for path in sorted(glob.glob(os.path.join(SAMPLES, "lineinfo_*.xml"))):
+        with open(path, "rb") as f:
+            data = f.read()
+        cached = LineInfoParser()
+        result = cached.parse(data)
+        if old_parse(data) != result:
+            raise SystemExit(f"{path}: parsers disagree: {old_parse(data)} vs {result}")
+        timings = [per_call_us(func, data, args.polls) for func in (old_parse, detect_parse, cached.parse)]
+        print(f"{os.path.basename(path):<20} {cached.schema:<17} " + " ".join(f"{t:7.1f}us" for t in timings))
+
+if __name__ == "__main__":
+    main()
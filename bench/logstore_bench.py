@@ -0,0 +1,87 @@
+"""Session log memory: the old unbounded log_history list vs the capped LogStore.
+
+Each simulated refresh logs what a poll used to log (request line, 500 bytes of LineInfo XML,
+parsed states) plus a thumbnail of a changed 800x480 frame. The old variant keeps every
+thumbnail as a Tk PhotoImage (a PIL image when no display is available, which understates
+it); the new one keeps PNG bytes in LogStore and spills evicted entries to disk.
+
+    python bench/logstore_bench.py [--refreshes 5000]
+"""
+import argparse, io, os, subprocess, sys, tempfile
+from standin import make_screenshot, LINE_INFO
+
+def rss_mb():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def poll_text(i):
+    return [
+        f"[12:00:00.000] [LINE_STATUS_REQUEST] HTTP GET http://10.0.0.{i % 250}/CGI/LineInfo\n",
+        f"[12:00:00.000] [LINE_STATUS_XML] Raw XML response:\n{(LINE_INFO * 3)[:500].decode()}...\n",
+        f"[12:00:00.000] [LINE_STATUS_RESPONSE] Line states: ['ON', 'OFF']\n",
+    ]
+
+def run_variant(variant, refreshes):
+    from PIL import Image
+    frames = [Image.open(io.BytesIO(make_screenshot(seed=s))).convert("RGB") for s in range(8)]
+    photo = None
+    if variant == "list":
+        try:
+            import tkinter
+            from PIL import ImageTk
+            tkinter.Tk().withdraw()
+            photo = ImageTk.PhotoImage
+        except Exception:
+            pass
+    else:
+        from cisco_logstore import LogStore
+        from cisco_frames import FrameRenderer
+        spill = os.path.join(tempfile.mkdtemp(), "bench.log")
+        store = LogStore(2000, 4 * 1024 * 1024, spill)
+        renderer = FrameRenderer((800, 480))
+
+    start = rss_mb()
+    log_history = []
+    for i in range(refreshes):
+        img = frames[i % len(frames)]
+        if variant == "list":
+            for text in poll_text(i):
+                log_history.append({"type": "text", "content": text})
+            thumb = img.resize((120, 72), Image.Resampling.LANCZOS)
+            log_history.append({"type": "image", "content": photo(thumb) if photo else thumb})
+        else:
+            for text in poll_text(i):
+                store.add_text(text)
+            _, thumb = renderer.render(img)
+            buf = io.BytesIO()
+            thumb.save(buf, format="PNG", optimize=True)
+            store.add_image(buf.getvalue())
+    if variant != "list":
+        # Evicted batches are written by the background spill thread; measure after it has caught up
+        from cisco_logstore import spill_writer
+        spill_writer.flush()
+    kind = "PhotoImage" if photo else "PIL image"
+    label = f"log_history list ({kind})" if variant == "list" else "LogStore (2000 entries / 4 MB)"
+    print(f"{label:<34} +{rss_mb() - start:8.1f} MB RSS after {refreshes} refreshes")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--refreshes", type=int, default=5000)
+    parser.add_argument("--variant", choices=["list", "store"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.variant:
+        run_variant(args.variant, args.refreshes)
+        return
+    # Each variant in its own process so one cannot inflate the other's RSS
+    for variant in ("list", "store"):
+        subprocess.run([sys.executable, os.path.abspath(__file__), "--variant", variant, "--refreshes", str(args.refreshes)], check=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Per-frame render time per phone model: FrameRenderer vs the old double LANCZOS resize.
+
+Each model gets a payload in the format and size its phone returns (7911: 192x64 2-bit CIP,
+7945: 320x222 palette BMP, 8841: 800x480 PNG). Decode time is the same for both and is
+reported once; the render columns time the resize stage on the decoded image. "old" resizes
+it to the display size and to the 120px log thumbnail with LANCZOS, as cisco_core did before
+FrameRenderer. A 7945 palette frame already has the display size, so both variants show it
+unconverted and take the thumbnail with NEAREST (Pillow's only filter for palette images).
+
+    python bench/render_bench.py [--frames 300]
+"""
+import argparse, io, random, time
+from PIL import Image
+from standin import make_screenshot, percentile
+from cisco_frames import decode_frame, FrameRenderer
+
+# Display size from each model's set_screen_dims
+MODELS = {"7911": (192, 64), "7945": (320, 222), "8841": (480, 272)}
+
+def cip_payload(width=192, height=64, seed=0):
+    rng = random.Random(seed)
+    pixels = bytes(rng.choice((0x00, 0x55, 0xFF)) for _ in range(width * height // 4))
+    return (f"<CiscoIPPhoneImage><LocationX>0</LocationX><LocationY>0</LocationY><Width>{width}</Width>"
+            f"<Height>{height}</Height><Depth>2</Depth><Data>{pixels.hex().upper()}</Data></CiscoIPPhoneImage>").encode()
+
+def bmp_payload(size=(320, 222), seed=0):
+    img = Image.open(io.BytesIO(make_screenshot(size, seed))).convert("P", palette=Image.Palette.ADAPTIVE, colors=16)
+    buf = io.BytesIO()
+    img.save(buf, format="BMP")
+    return buf.getvalue()
+
+def payload(model):
+    if model == "7911":
+        return cip_payload()
+    if model == "7945":
+        return bmp_payload()
+    return make_screenshot((800, 480))
+
+def old_render(img, display_size, thumb_width=120):
+    thumb_size = (thumb_width, int(thumb_width * display_size[1] / display_size[0]))
+    log_img = img.resize(thumb_size, Image.Resampling.LANCZOS)
+    return img.resize(display_size, Image.Resampling.LANCZOS), log_img
+
+def decode(data):
+    img = decode_frame(data)
+    img.load()
+    return img
+
+def time_frames(func, arg, frames):
+    latencies = []
+    for _ in range(frames):
+        start = time.perf_counter()
+        func(arg)
+        latencies.append(time.perf_counter() - start)
+    return percentile(latencies, 50) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=300, help="frames per model and variant")
+    args = parser.parse_args()
+    print(f"{'model':<6} {'payload':<18} {'decode':>9} {'old render':>11} {'new render':>11} {'speedup':>8}  (p50 per frame)")
+    for model, display_size in MODELS.items():
+        data = payload(model)
+        img = decode(data)
+        renderer = FrameRenderer(display_size)
+        # Warm up the palette cache
+        renderer.render(img)
+        dec = time_frames(decode, data, args.frames)
+        old = time_frames(lambda i: old_render(i, display_size), img, args.frames)
+        new = time_frames(renderer.render, img, args.frames)
+        source = f"{img.format or 'CIP'} {img.size[0]}x{img.size[1]}"
+        print(f"{model:<6} {source:<18} {dec:7.2f}ms {old:9.2f}ms {new:9.2f}ms {old / new:7.1f}x")
+
+if __name__ == "__main__":
+    main()
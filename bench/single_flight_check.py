@@ -0,0 +1,78 @@
+"""Single-flight screenshot check: concurrent refresh() calls against a slow stand-in phone share one fetch.
+
+    python bench/single_flight_check.py [--threads 20] [--delay 0.3]
+
+Fails with an AssertionError if a burst of refresh() calls makes more than one request
+(plus one follow-up when a fresh=True call joined it), or if the joined calls are not counted
+in coalesced_refreshes.
+"""
+import argparse, threading, time
+from standin import StandInPhone
+from engine_bench import open_session
+from cisco_session import PhoneFleet
+
+def wait_idle(session, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with session.refresh_lock:
+            if not session.is_refreshing:
+                return
+        time.sleep(0.01)
+    raise AssertionError("screenshot fetch did not finish")
+
+def burst(session, threads, fresh_index=None):
+    """Call refresh() from `threads` threads at once; return (fetches, coalesced) it caused"""
+    fetches, coalesced = session.fetch_count, session.coalesced_refreshes
+    barrier = threading.Barrier(threads)
+
+    def _call(i):
+        barrier.wait()
+        session.refresh(fresh=(i == fresh_index))
+
+    workers = [threading.Thread(target=_call, args=(i,)) for i in range(threads)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    wait_idle(session)
+    return session.fetch_count - fetches, session.coalesced_refreshes - coalesced
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=20)
+    parser.add_argument("--delay", type=float, default=0.3, help="seconds the stand-in holds every response")
+    args = parser.parse_args()
+
+    phone = StandInPhone(delay=args.delay).start()
+    fleet = PhoneFleet()
+    try:
+        # Not polling: every fetch below comes from the refresh() calls
+        session = open_session(fleet, phone.port)
+
+        fetches, coalesced = burst(session, args.threads)
+        print(f"{args.threads} concurrent refresh():            {fetches} fetch, {coalesced} coalesced")
+        assert fetches == 1, fetches
+        assert coalesced == args.threads - 1, coalesced
+
+        # The request the fresh caller joined may predate its action, so exactly one more follows.
+        # The fresh caller may also be the one that starts the fetch; force it to join instead
+        before = session.fetch_count
+        session.refresh()
+        _, coalesced = burst(session, args.threads, fresh_index=0)
+        fetches = session.fetch_count - before
+        print(f"{args.threads} concurrent refresh(), one fresh: {fetches} fetches, {coalesced} coalesced")
+        assert fetches == 2, fetches
+        assert coalesced == args.threads, coalesced
+
+        fetches, coalesced = burst(session, 1)
+        print(f"refresh() once the fetch is done:      {fetches} fetch, {coalesced} coalesced")
+        assert (fetches, coalesced) == (1, 0), (fetches, coalesced)
+
+        assert phone.hits["screenshot"] == session.fetch_count, (phone.hits, session.fetch_count)
+        print(f"OK: {session.fetch_count} screenshot requests reached the phone")
+    finally:
+        fleet.close_all()
+        phone.stop()
+
+if __name__ == "__main__":
+    main()
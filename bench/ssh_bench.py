@@ -0,0 +1,204 @@
+"""SSH bridge: exec'ing curl on the jump host vs HTTP over a reused direct-tcpip tunnel.
+
+A paramiko stand-in jump host runs on 127.0.0.1 behind a proxy that delays traffic by
+--rtt milliseconds per round trip, so the numbers approximate a distant jump host.
+
+    python bench/ssh_bench.py [--requests 50] [--rtt 0,20,60]
+"""
+import argparse, heapq, shlex, socket, subprocess, threading, time
+import paramiko
+from standin import StandInPhone, summarize
+from cisco_transport import CurlTransport, SSHTunnelTransport, execute_payload
+
+class JumpHost(paramiko.ServerInterface):
+    """Accepts any password, runs exec requests locally and forwards direct-tcpip channels"""
+    def __init__(self):
+        self.destinations = {}
+
+    def check_auth_password(self, username, password):
+        return paramiko.AUTH_SUCCESSFUL
+
+    def get_allowed_auths(self, username):
+        return "password"
+
+    def check_channel_request(self, kind, chanid):
+        return paramiko.OPEN_SUCCEEDED
+
+    def check_channel_direct_tcpip_request(self, chanid, origin, destination):
+        self.destinations[chanid] = destination
+        return paramiko.OPEN_SUCCEEDED
+
+    def check_channel_exec_request(self, channel, command):
+        threading.Thread(target=self._exec, args=(channel, command.decode()), daemon=True).start()
+        return True
+
+    def _exec(self, channel, command):
+        proc = subprocess.run(shlex.split(command), capture_output=True)
+        channel.sendall(proc.stdout)
+        channel.sendall_stderr(proc.stderr)
+        channel.send_exit_status(proc.returncode)
+        channel.close()
+
+def _pipe(src, dst):
+    try:
+        while True:
+            data = src.recv(65536)
+            if not data:
+                break
+            dst.sendall(data)
+    except (OSError, EOFError):
+        pass
+    finally:
+        for end in (src, dst):
+            try:
+                end.close()
+            except Exception:
+                pass
+
+def serve_ssh(host_key):
+    listener = socket.socket()
+    listener.bind(("127.0.0.1", 0))
+    listener.listen(8)
+
+    def _accept():
+        while True:
+            conn, _ = listener.accept()
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            transport = paramiko.Transport(conn)
+            transport.add_server_key(host_key)
+            server = JumpHost()
+            transport.start_server(server=server)
+            threading.Thread(target=_channels, args=(transport, server), daemon=True).start()
+
+    def _channels(transport, server):
+        while transport.is_active():
+            chan = transport.accept(1)
+            if chan is None:
+                continue
+            destination = server.destinations.pop(chan.get_id(), None)
+            if destination is not None:
+                upstream = socket.create_connection(destination)
+                upstream.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                threading.Thread(target=_pipe, args=(chan, upstream), daemon=True).start()
+                threading.Thread(target=_pipe, args=(upstream, chan), daemon=True).start()
+
+    threading.Thread(target=_accept, daemon=True).start()
+    return listener.getsockname()[1]
+
+class DelayProxy:
+    """TCP proxy that holds every chunk for rtt/2 in each direction"""
+    def __init__(self, target_port, rtt):
+        self.target_port = target_port
+        self.delay = rtt / 2
+        self.listener = socket.socket()
+        self.listener.bind(("127.0.0.1", 0))
+        self.listener.listen(8)
+        self.port = self.listener.getsockname()[1]
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self):
+        while True:
+            client, _ = self.listener.accept()
+            client.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            upstream = socket.create_connection(("127.0.0.1", self.target_port))
+            upstream.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self._direction(client, upstream)
+            self._direction(upstream, client)
+
+    def _direction(self, src, dst):
+        pending = []
+        cond = threading.Condition()
+
+        def _read():
+            seq = 0
+            while True:
+                try:
+                    data = src.recv(65536)
+                except OSError:
+                    data = b""
+                with cond:
+                    heapq.heappush(pending, (time.monotonic() + self.delay, seq, data))
+                    seq += 1
+                    cond.notify()
+                if not data:
+                    return
+
+        def _write():
+            while True:
+                with cond:
+                    while not pending:
+                        cond.wait()
+                    due, _, data = pending[0]
+                    wait = due - time.monotonic()
+                    if wait > 0:
+                        cond.wait(wait)
+                        continue
+                    heapq.heappop(pending)
+                if not data:
+                    try:
+                        dst.shutdown(socket.SHUT_WR)
+                    except OSError:
+                        pass
+                    return
+                try:
+                    dst.sendall(data)
+                except OSError:
+                    return
+
+        threading.Thread(target=_read, daemon=True).start()
+        threading.Thread(target=_write, daemon=True).start()
+
+def ssh_runner(client, timeout=30):
+    # Same as PhoneSession.exec_cmd in SSH mode
+    def _run(cmd):
+        stdin, stdout, stderr = client.exec_command(cmd, timeout=timeout)
+        try:
+            return stdout.read(), stderr.read()
+        finally:
+            stdout.channel.close()
+    return _run
+
+def bench(label, call, count):
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(count):
+        t = time.perf_counter()
+        data, err = call()
+        latencies.append(time.perf_counter() - t)
+        if not data:
+            raise SystemExit(f"{label}: request failed: {err!r}")
+    return summarize(label, latencies, time.perf_counter() - start)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=50, help="requests per mode, endpoint and RTT")
+    parser.add_argument("--rtt", default="0,20,60", help="comma separated round-trip times in ms")
+    args = parser.parse_args()
+
+    phone = StandInPhone().start()
+    ssh_port = serve_ssh(paramiko.RSAKey.generate(2048))
+    payload = execute_payload("Key:Soft1")
+    try:
+        for rtt in [float(v) for v in args.rtt.split(",")]:
+            proxy = DelayProxy(ssh_port, rtt / 1000)
+            client = paramiko.SSHClient()
+            client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+            client.connect("127.0.0.1", proxy.port, username="admin", password="admin", look_for_keys=False, allow_agent=False)
+            # As cisco_sshpool does for the app's jump host connections
+            client.get_transport().sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            transports = [
+                CurlTransport(phone.address, "admin", "admin", ssh_runner(client)),
+                SSHTunnelTransport("127.0.0.1", "admin", "admin", client, port=phone.port),
+            ]
+            print(f"RTT {rtt:g} ms, {args.requests} sequential requests each")
+            for transport in transports:
+                label = "exec curl" if transport.name == "curl" else "tunnel"
+                print(bench(f"  {label} /CGI/Screenshot", lambda: transport.get("/CGI/Screenshot"), args.requests))
+                print(bench(f"  {label} /CGI/Execute", lambda: transport.post_xml("/CGI/Execute", payload), args.requests))
+                transport.close()
+            client.close()
+    finally:
+        phone.stop()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""Stand-in phone web server for the benchmarks: answers /CGI/Screenshot, /CGI/LineInfo and /CGI/Execute like a phone"""
+import io, os, socket, sys, threading, time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+LINE_INFO = (b"<?xml version=\"1.0\"?><CiscoIPPhoneLineInfo>"
+             b"<CiscoIPPhoneLine><LineIconState>ON</LineIconState><Name>1001</Name></CiscoIPPhoneLine>"
+             b"<CiscoIPPhoneLine><LineIconState>OFF</LineIconState><Name>1002</Name></CiscoIPPhoneLine>"
+             b"<MessageWaiting>NO</MessageWaiting></CiscoIPPhoneLineInfo>")
+
+EXECUTE_OK = b"<CiscoIPPhoneResponse><ResponseItem Status=\"0\" Data=\"Success\" URL=\"Key:Soft1\"/></CiscoIPPhoneResponse>"
+
+def make_screenshot(size=(800, 480), seed=0):
+    """A PNG with some structure, roughly the size a phone returns"""
+    from PIL import Image, ImageDraw
+    img = Image.new("RGB", size, (20, 40, 60))
+    draw = ImageDraw.Draw(img)
+    for i in range(0, size[1], 16):
+        draw.text((4, i), f"Line {i // 16 + seed}  1000{i}  ext {seed}", fill=(230, 230, 230))
+    buf = io.BytesIO()
+    img.save(buf, format="PNG")
+    return buf.getvalue()
+
+class StandInPhone:
+    """Threaded HTTP/1.1 keep-alive server on 127.0.0.1; `delay` is added before every response"""
+    def __init__(self, delay=0.0, screenshot=None, line_info=None, port=0):
+        self.delay = delay
+        self.screenshot = screenshot if screenshot is not None else make_screenshot()
+        self.line_info = line_info if line_info is not None else LINE_INFO
+        self.hits = {"screenshot": 0, "lineinfo": 0, "execute": 0}
+        self.lock = threading.Lock()
+        phone = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body go out in separate writes; without this Nagle + delayed ACK add ~40 ms
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def _reply(self, kind, body, content_type):
+                with phone.lock:
+                    phone.hits[kind] += 1
+                if phone.delay:
+                    time.sleep(phone.delay)
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                if self.path.startswith("/CGI/Screenshot"):
+                    self._reply("screenshot", phone.screenshot, "image/png")
+                elif self.path.startswith("/CGI/LineInfo"):
+                    self._reply("lineinfo", phone.line_info, "text/xml")
+                else:
+                    self.send_error(404)
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                if self.path.startswith("/CGI/Execute"):
+                    self._reply("execute", EXECUTE_OK, "text/xml")
+                else:
+                    self.send_error(404)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def address(self):
+        return f"127.0.0.1:{self.port}"
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+def summarize(label, latencies, elapsed):
+    """One result row: requests/sec, p50 and p99 in milliseconds"""
+    return f"{label:<34} {len(latencies) / elapsed:8.1f} req/s  p50 {percentile(latencies, 50) * 1000:7.2f} ms  p99 {percentile(latencies, 99) * 1000:7.2f} ms"
+
+class HungPhone:
+    """Accepts connections but never answers, like a phone whose web server has wedged"""
+    def __init__(self):
+        self.sock = socket.socket()
+        self.sock.bind(("127.0.0.1", 0))
+        self.sock.listen(128)
+        self.port = self.sock.getsockname()[1]
+        self.conns = []
+        self.thread = threading.Thread(target=self._accept, daemon=True)
+
+    def _accept(self):
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return
+            self.conns.append(conn)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.sock.close()
+        for conn in self.conns:
+            conn.close()
+
+if __name__ == "__main__":
+    # Serve from a separate process so the stand-in's threads do not count against the client's
+    import argparse
+    parser = argparse.ArgumentParser(description="Run a stand-in phone until stdin closes")
+    parser.add_argument("--delay", type=float, default=0.0)
+    args = parser.parse_args()
+    phone = StandInPhone(delay=args.delay).start()
+    print(phone.port, flush=True)
+    sys.stdin.read()
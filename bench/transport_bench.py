@@ -0,0 +1,48 @@
+"""curl subprocess vs in-process keep-alive transport against a local stand-in phone.
+
+    python bench/transport_bench.py [--requests 300] [--delay 0]
+"""
+import argparse, shlex, subprocess, time
+from standin import StandInPhone, summarize
+from cisco_transport import CurlTransport, HttpTransport, execute_payload
+
+def run_local(cmd):
+    # Same as PhoneSession.exec_cmd in local mode
+    proc = subprocess.run(shlex.split(cmd), capture_output=True)
+    return proc.stdout, proc.stderr
+
+def bench(label, call, count):
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(count):
+        t = time.perf_counter()
+        data, err = call()
+        latencies.append(time.perf_counter() - t)
+        if not data:
+            raise SystemExit(f"{label}: request failed: {err!r}")
+    return summarize(label, latencies, time.perf_counter() - start)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=300, help="requests per transport and endpoint")
+    parser.add_argument("--delay", type=float, default=0.0, help="seconds the stand-in waits before answering")
+    args = parser.parse_args()
+
+    phone = StandInPhone(delay=args.delay).start()
+    transports = [
+        CurlTransport(phone.address, "admin", "admin", run_local),
+        HttpTransport("127.0.0.1", "admin", "admin", port=phone.port),
+    ]
+    payload = execute_payload("Key:Soft1")
+    print(f"{args.requests} sequential requests each, screenshot {len(phone.screenshot)} bytes")
+    try:
+        for transport in transports:
+            print(bench(f"{transport.name} /CGI/Screenshot", lambda: transport.get("/CGI/Screenshot"), args.requests))
+            print(bench(f"{transport.name} /CGI/LineInfo", lambda: transport.get("/CGI/LineInfo"), args.requests))
+            print(bench(f"{transport.name} /CGI/Execute", lambda: transport.post_xml("/CGI/Execute", payload), args.requests))
+            transport.close()
+    finally:
+        phone.stop()
+
+if __name__ == "__main__":
+    main()
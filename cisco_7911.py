@@ -106,6 +106,8 @@ class Cisco7911Phone(CiscoBasePhone):
         ff.pack(fill="x", side="bottom")
         tk.Button(ff, text="CONSOLE LOGS", bg="#121212", fg="#7f8c8d", font=("Segoe UI", 8, "bold"), relief="flat", command=self.toggle_logs).pack(side="left", padx=10, pady=5)
         tk.Button(ff, text="RELOAD CONFIG", bg="#34495e", fg="white", font=("Segoe UI", 8, "bold"), relief="flat", command=self.reload_btn_config).pack(side="left", padx=5)
+        tk.Button(ff, text="DIAL", bg="#34495e", fg="white", font=("Segoe UI", 8, "bold"), relief="flat", command=self.prompt_dial).pack(side="left", padx=5)
+        tk.Button(ff, text="HISTORY", bg="#34495e", fg="white", font=("Segoe UI", 8, "bold"), relief="flat", command=self.toggle_history).pack(side="left", padx=5)
         self.countdown_label = tk.Label(ff, text="Next Refresh: 5s", bg="#1e1e1e", fg="#0F0", font=("Segoe UI", 9, "bold"))
         self.countdown_label.pack(side="left", padx=20)
         tk.Button(ff, text="REFRESH SCREEN", bg="#27ae60", fg="white", font=("Segoe UI", 8, "bold"), relief="flat", command=self.refresh_screen).pack(side="right", padx=10)
\ No newline at end of file
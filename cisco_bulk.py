@@ -0,0 +1,224 @@
+import argparse, csv, ipaddress, json, os, sys, threading, time
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from cisco_session import PhoneSession, get_config_dir, keypad_uris
+from cisco_transport import MAX_EXECUTE_ITEMS, request_not_sent
+
+RESULT_FIELDS = ["name", "ip", "ok", "latency_ms", "attempts", "response", "error"]
+
+def load_presets():
+    sessions_file = os.path.join(get_config_dir(), "sessions.json")
+    if not os.path.exists(sessions_file):
+        return []
+    try:
+        with open(sessions_file, 'r') as f:
+            data = json.load(f)
+    except Exception:
+        return []
+    # Support both old dict format and new list format
+    if isinstance(data, dict):
+        return [{"name": k, **v} for k, v in data.items()]
+    return data
+
+def make_target(ip, dtype="8841", connection="ssh", ssh="default", cgi="default", transport="native", name=None):
+    return {"name": name or ip, "ip": ip, "type": dtype, "connection": connection, "ssh": ssh, "cgi": cgi, "transport": transport}
+
+def preset_target(sess):
+    return make_target(
+        sess["ip"], sess.get("type", "8841"), sess.get("connection", "ssh"),
+        sess.get("ssh") or "default", sess.get("cgi", "default"),
+        sess.get("transport", "native"), sess.get("name")
+    )
+
+def resolve_targets(preset_names=None, ips=None, cidrs=None, **defaults):
+    """Build the phone list from sessions.json presets, explicit IPs and CIDR ranges.
+
+    preset_names=None skips presets; an empty list selects every preset.
+    """
+    targets = []
+    if preset_names is not None:
+        wanted = set(preset_names)
+        for sess in load_presets():
+            if wanted and sess.get("name") not in wanted:
+                continue
+            targets.append(preset_target(sess))
+    for ip in ips or []:
+        targets.append(make_target(ip, **defaults))
+    for cidr in cidrs or []:
+        for host in ipaddress.ip_network(cidr, strict=False).hosts():
+            targets.append(make_target(str(host), **defaults))
+    return targets
+
+def add_target_arguments(parser):
+    """The target selection and connection options shared by the bulk command line tools"""
+    parser.add_argument("--preset", action="append", default=None, help="preset name from sessions.json (repeatable); use --all-presets for every preset")
+    parser.add_argument("--all-presets", action="store_true")
+    parser.add_argument("--ip", action="append", default=[], help="phone IP (repeatable)")
+    parser.add_argument("--cidr", action="append", default=[], help="network range, e.g. 10.1.20.0/24 (repeatable)")
+    parser.add_argument("--type", default="8841", choices=["8841", "7911", "7945"], help="model for --ip/--cidr targets")
+    parser.add_argument("--connection", default="ssh", choices=["ssh", "local"])
+    parser.add_argument("--ssh", default="default", help="ssh.conf profile for --ip/--cidr targets")
+    parser.add_argument("--cgi", default="default", help="cgi.conf profile for --ip/--cidr targets")
+    parser.add_argument("--transport", default="native", choices=["native", "curl"])
+    parser.add_argument("--workers", type=int, default=32)
+    parser.add_argument("--per-host", type=int, default=8, help="max concurrent phones per jump host")
+
+def targets_from_args(args):
+    presets = [] if args.all_presets else args.preset
+    return resolve_targets(presets, args.ip, args.cidr, dtype=args.type, connection=args.connection, ssh=args.ssh, cgi=args.cgi, transport=args.transport)
+
+class HostSlots:
+    """One semaphore per jump host (all direct phones share "local"), bounding concurrent phones behind it"""
+    def __init__(self, limit):
+        self.limit = limit
+        self.slots = {}
+        self.lock = threading.Lock()
+
+    def __call__(self, target):
+        key = f"ssh:{target['ssh']}" if target["connection"] == "ssh" else "local"
+        with self.lock:
+            slot = self.slots.get(key)
+            if slot is None:
+                slot = self.slots[key] = threading.Semaphore(self.limit)
+            return slot
+
+def response_ok(resp):
+    """A CiscoIPPhoneResponse whose ResponseItems all report Status 0"""
+    if not resp:
+        return False
+    try:
+        root = ET.fromstring(resp)
+    except ET.ParseError:
+        return False
+    if root.tag == "CiscoIPPhoneError":
+        return False
+    return all(item.get("Status", "0") == "0" for item in root.iter("ResponseItem"))
+
+class BulkRunner:
+    """Runs one key/URI sequence on many phones with a bounded worker pool and per-jump-host limits"""
+    def __init__(self, max_workers=32, per_host_limit=8, retries=2, retry_delay=1.0):
+        self.max_workers = max_workers
+        self.per_host_limit = per_host_limit
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.host_slot = HostSlots(per_host_limit)
+        self.cancelled = threading.Event()
+
+    def cancel(self):
+        """Stop starting new phones and new batches; requests already on the wire finish"""
+        self.cancelled.set()
+
+    def run(self, targets, uris, progress=None):
+        results = [None] * len(targets)
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="bulk") as pool:
+            futures = {pool.submit(self.run_one, target, uris): i for i, target in enumerate(targets)}
+            for future in as_completed(futures):
+                result = future.result()
+                results[futures[future]] = result
+                if progress:
+                    progress(result)
+        return results
+
+    def _retrying(self, func, result):
+        last_error = None
+        for attempt in range(1, self.retries + 2):
+            result["attempts"] = max(result["attempts"], attempt)
+            try:
+                return func()
+            except Exception as e:
+                last_error = e
+                if attempt <= self.retries:
+                    time.sleep(self.retry_delay * attempt)
+        raise last_error
+
+    def run_one(self, target, uris):
+        result = {"name": target["name"], "ip": target["ip"], "ok": False, "latency_ms": 0, "attempts": 0, "response": "", "error": ""}
+        with self.host_slot(target):
+            # Latency is measured from here: time queued behind the per-host limit is not the phone's
+            start = time.monotonic()
+            if self.cancelled.is_set():
+                result["error"] = "Cancelled"
+                return result
+            session = PhoneSession(target["ip"], target["type"], target["connection"], target["ssh"], target["cgi"], target["transport"])
+            try:
+                self._retrying(session.connect, result)
+                responses = []
+                for i in range(0, len(uris), MAX_EXECUTE_ITEMS):
+                    if self.cancelled.is_set():
+                        result["error"] = "Cancelled"
+                        break
+                    batch = uris[i:i + MAX_EXECUTE_ITEMS]
+                    # Only requests that failed before reaching the phone (connect errors) are retried.
+                    # A timeout or dropped connection after sending is reported as is: the phone may
+                    # already have run the keys, and sending them again could repeat them
+                    def _send():
+                        resp, err = session.post_execute(batch)
+                        if err and not resp and request_not_sent(err):
+                            raise ConnectionError(err)
+                        return resp, err
+                    resp, err = self._retrying(_send, result)
+                    responses.append(resp)
+                    if err or not response_ok(resp):
+                        result["error"] = err or "Phone rejected the request"
+                        break
+                result["response"] = " | ".join(responses)
+                result["ok"] = not result["error"]
+            except Exception as e:
+                result["error"] = str(e) or e.__class__.__name__
+            finally:
+                session.close()
+        result["latency_ms"] = int((time.monotonic() - start) * 1000)
+        return result
+
+def format_table(results):
+    rows = [["NAME", "IP", "OK", "LATENCY", "TRIES", "DETAIL"]]
+    for r in results:
+        detail = r["error"] or r["response"]
+        rows.append([r["name"], r["ip"], "yes" if r["ok"] else "NO", f"{r['latency_ms']} ms", str(r["attempts"]), detail[:80]])
+    widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]) - 1)]
+    lines = []
+    for row in rows:
+        lines.append("  ".join(cell.ljust(w) for cell, w in zip(row, widths)) + "  " + row[-1])
+    ok = sum(1 for r in results if r["ok"])
+    lines.append(f"\n{ok}/{len(results)} phones succeeded")
+    return "\n".join(lines)
+
+def write_csv(results, path):
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=RESULT_FIELDS)
+        writer.writeheader()
+        for r in results:
+            writer.writerow({k: r[k] for k in RESULT_FIELDS})
+
+def parse_uris(keys):
+    return [k.strip() for k in keys.split(",") if k.strip()]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Send a key/URI sequence to many Cisco phones at once")
+    add_target_arguments(parser)
+    parser.add_argument("--keys", default="", help="comma separated URIs, e.g. Key:Settings,Key:KeyPad4")
+    parser.add_argument("--dial", default="", help="digits to send as keypad presses")
+    parser.add_argument("--retries", type=int, default=2)
+    parser.add_argument("--csv", help="write the result table to this CSV file")
+    args = parser.parse_args(argv)
+
+    targets = targets_from_args(args)
+    uris = parse_uris(args.keys)
+    if args.dial:
+        uris += keypad_uris(args.dial)
+    if not targets or not uris:
+        parser.error("need at least one target (--preset/--all-presets/--ip/--cidr) and one key (--keys/--dial)")
+
+    runner = BulkRunner(args.workers, args.per_host, args.retries)
+    done = [0]
+    def _progress(result):
+        done[0] += 1
+        print(f"[{done[0]}/{len(targets)}] {result['ip']}: {'ok' if result['ok'] else result['error']}", file=sys.stderr)
+    results = runner.run(targets, uris, _progress)
+    print(format_table(results))
+    if args.csv:
+        write_csv(results, args.csv)
+    return 0 if all(r["ok"] for r in results) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
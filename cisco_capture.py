@@ -0,0 +1,135 @@
+import argparse, hashlib, io, json, os, re, sys, tarfile, threading, time, zipfile
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from cisco_session import PhoneSession
+from cisco_frames import image_info
+from cisco_bulk import HostSlots, add_target_arguments, targets_from_args
+
+def safe_name(text):
+    return re.sub(r"[^A-Za-z0-9._-]+", "_", text).strip("_") or "phone"
+
+class DirectoryWriter:
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    def write(self, name, data):
+        with open(os.path.join(self.path, name), "wb") as f:
+            f.write(data)
+
+    def close(self):
+        pass
+
+class ZipWriter:
+    def __init__(self, path):
+        self.zf = zipfile.ZipFile(path, "w")
+        self.lock = threading.Lock()
+
+    def write(self, name, data):
+        # PNGs are already compressed; BMP/CIP/manifest text shrink well with deflate
+        compress = zipfile.ZIP_STORED if name.endswith(".png") else zipfile.ZIP_DEFLATED
+        with self.lock:
+            self.zf.writestr(name, data, compress_type=compress)
+
+    def close(self):
+        self.zf.close()
+
+class TarWriter:
+    def __init__(self, path):
+        self.tf = tarfile.open(path, "w:gz" if path.endswith((".tgz", ".tar.gz")) else "w")
+        self.lock = threading.Lock()
+
+    def write(self, name, data):
+        info = tarfile.TarInfo(name)
+        info.size = len(data)
+        info.mtime = time.time()
+        with self.lock:
+            self.tf.addfile(info, io.BytesIO(data))
+
+    def close(self):
+        self.tf.close()
+
+def open_writer(output):
+    if output.endswith(".zip"):
+        return ZipWriter(output)
+    if output.endswith((".tar", ".tgz", ".tar.gz")):
+        return TarWriter(output)
+    return DirectoryWriter(output)
+
+class ScreenshotCapture:
+    """Pulls /CGI/Screenshot from many phones in parallel and streams the raw payloads to a directory or archive"""
+    def __init__(self, max_workers=32, per_host_limit=8, timeout=10):
+        self.max_workers = max_workers
+        self.per_host_limit = per_host_limit
+        self.timeout = timeout
+        self.host_slot = HostSlots(per_host_limit)
+
+    def run(self, targets, output, manifest=True, progress=None):
+        writer = open_writer(output)
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        results = [None] * len(targets)
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="capture") as pool:
+                futures = {pool.submit(self.capture_one, target, writer, stamp): i for i, target in enumerate(targets)}
+                for future in as_completed(futures):
+                    result = future.result()
+                    results[futures[future]] = result
+                    if progress:
+                        progress(result)
+            if manifest:
+                writer.write("manifest.json", json.dumps(results, indent=2).encode())
+        finally:
+            writer.close()
+        return results
+
+    def capture_one(self, target, writer, stamp):
+        result = {"name": target["name"], "ip": target["ip"], "ok": False, "file": "", "format": "", "width": 0, "height": 0, "bytes": 0, "sha256": "", "latency_ms": 0, "error": ""}
+        with self.host_slot(target):
+            # Latency is measured from here: time queued behind the per-host limit is not the phone's
+            start = time.monotonic()
+            session = PhoneSession(target["ip"], target["type"], target["connection"], target["ssh"], target["cgi"], target["transport"])
+            session.request_timeout = self.timeout
+            try:
+                session.connect()
+                data, err = session.transport.get("/CGI/Screenshot")
+                if data and len(data) > 500:
+                    # Stored exactly as received: no decode, no re-encode
+                    fmt, width, height = image_info(data)
+                    label = target["ip"] if target["name"] == target["ip"] else f"{target['name']}_{target['ip']}"
+                    name = f"{safe_name(label)}_{stamp}.{fmt}"
+                    writer.write(name, data)
+                    result.update(ok=True, file=name, format=fmt, width=width, height=height, bytes=len(data), sha256=hashlib.sha256(data).hexdigest())
+                else:
+                    result["error"] = err.decode(errors="replace").strip() if err else "No data received"
+            except Exception as e:
+                result["error"] = str(e) or e.__class__.__name__
+            finally:
+                session.close()
+        result["latency_ms"] = int((time.monotonic() - start) * 1000)
+        return result
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Capture screenshots from many Cisco phones into a folder or archive")
+    parser.add_argument("output", help="target directory, or a .zip / .tar / .tar.gz archive")
+    add_target_arguments(parser)
+    parser.add_argument("--timeout", type=float, default=10, help="per-request timeout in seconds")
+    parser.add_argument("--no-manifest", action="store_true", help="skip manifest.json (dimensions and SHA-256 per image)")
+    args = parser.parse_args(argv)
+
+    targets = targets_from_args(args)
+    if not targets:
+        parser.error("need at least one target (--preset/--all-presets/--ip/--cidr)")
+
+    capture = ScreenshotCapture(args.workers, args.per_host, args.timeout)
+    done = [0]
+    def _progress(result):
+        done[0] += 1
+        print(f"[{done[0]}/{len(targets)}] {result['ip']}: {result['file'] if result['ok'] else result['error']}", file=sys.stderr)
+    start = time.monotonic()
+    results = capture.run(targets, args.output, not args.no_manifest, _progress)
+    ok = sum(1 for r in results if r["ok"])
+    print(f"{ok}/{len(results)} screenshots captured to {args.output} in {time.monotonic() - start:.1f}s")
+    return 0 if ok == len(results) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,43 @@
+import os, json, threading
+
+class ConfigCache:
+    """Parsed JSON config files shared by every window, keyed by absolute path.
+
+    Each lookup costs one os.stat(); the file is only read and parsed again when its
+    mtime or size changed, so edits made in the dashboard or by hand are picked up by
+    all sessions on their next load. Returned objects are shared: treat them as read-only
+    and copy before editing.
+    """
+    def __init__(self):
+        self.entries = {}  # path -> ((mtime_ns, size), parsed)
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.loads = 0
+
+    def load(self, path):
+        """Parsed contents of `path`; raises OSError / json.JSONDecodeError like open() + json.load()"""
+        path = os.path.abspath(path)
+        st = os.stat(path)
+        stamp = (st.st_mtime_ns, st.st_size)
+        with self.lock:
+            entry = self.entries.get(path)
+            if entry is not None and entry[0] == stamp:
+                self.hits += 1
+                return entry[1]
+        # Parse outside the lock; two threads racing on the same stale file both parse it once
+        with open(path, 'r') as f:
+            data = json.load(f)
+        with self.lock:
+            self.entries[path] = (stamp, data)
+            self.loads += 1
+        return data
+
+    def invalidate(self, path=None):
+        """Forget one file (after writing it ourselves) or everything"""
+        with self.lock:
+            if path is None:
+                self.entries.clear()
+            else:
+                self.entries.pop(os.path.abspath(path), None)
+
+config_cache = ConfigCache()
@@ -1,41 +1,30 @@
-import os, paramiko, io, json, threading, time, subprocess, sys
-from PIL import Image, ImageTk
+import os, io, math, threading, paramiko
+from collections import deque
 from datetime import datetime
+from PIL import ImageTk
 import tkinter as tk
-from tkinter import scrolledtext, messagebox
-import xml.etree.ElementTree as ET
-
-def resource_path(relative_path):
-    """ Get absolute path to resource, works for dev and for PyInstaller """
-    try:
-        base_path = sys._MEIPASS
-    except Exception:
-        base_path = os.path.abspath(".")
-    return os.path.join(base_path, relative_path)
-
-def get_config_dir():
-    """Consistency helper to find the persistent AppData folder so settings load correctly"""
-    if getattr(sys, 'frozen', False):
-        if os.name == 'nt':
-            base_dir = os.path.join(os.environ.get('APPDATA', ''), 'CGI_Remote_Control')
-        else:
-            base_dir = os.path.join(os.path.expanduser('~'), '.cgi_remote_control')
-    else:
-        # If running as script, check for 'config' folder
-        base_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config')
-    
-    if not os.path.exists(base_dir):
-        os.makedirs(base_dir, exist_ok=True)
-    return base_dir
+from tkinter import messagebox, simpledialog
+from cisco_session import PhoneSession, resource_path, get_config_dir
+from cisco_engine import phone_engine
+from cisco_frames import decode_frame, FrameRenderer
+from cisco_logview import LogViewer
 
 class CiscoBasePhone(tk.Toplevel):
-    def __init__(self, parent, phone_ip, device_type, connection_mode, ssh_config_name="default", cgi_config_name="default"):
+    """Tk view over a headless PhoneSession; model subclasses only lay out the buttons"""
+    compare_frame_pixels = False
+    refresh_tick_ms = 250
+    log_flush_ms = 100  # log entries reach an open log window in batches at most this often
+    log_flush_batch = 200
+
+    def __init__(self, parent, phone_ip, device_type, connection_mode, ssh_config_name="default", cgi_config_name="default", transport_mode="native"):
         super().__init__(parent)
         self.phone_ip = phone_ip
         self.device_type = device_type
         self.connection_mode = connection_mode
         self.ssh_config_name = ssh_config_name
         self.cgi_config_name = cgi_config_name
+        self.transport_mode = transport_mode
+        self.session = PhoneSession(phone_ip, device_type, connection_mode, ssh_config_name, cgi_config_name, transport_mode)
         self.title(f"Cisco {device_type} - {phone_ip} ({connection_mode.upper()}: {ssh_config_name if connection_mode == 'ssh' else 'Direct'})")
         self.configure(bg="#121212")
         
@@ -58,15 +47,21 @@ class CiscoBasePhone(tk.Toplevel):
             "UNKNOWN": ("#1a1a1a", "#555555")
         }
         
-        self.config_file = os.path.join(get_config_dir(), f"keys_{device_type}.json")
-        
         self.log_extra_window = None
-        self.log_txt = None
-        self.log_history = []
-        self.is_refreshing = False
-        self.refresh_interval = 5 
-        self.time_left = self.refresh_interval
-        self.waiting_for_image = False 
+        self.log_pending = deque()
+        self.log_pending_lock = threading.Lock()
+        self.log_flush_scheduled = False
+        self.history_window = None
+        self.history_index = -1
+        self.log_store = self.session.log_store
+        self.session.frame_diff.compare_pixels = self.compare_frame_pixels
+        self.session.on_log = self._append_to_log_widget
+        self.session.on_frame = self._render_frame
+        self.session.on_voicemail = self._update_voicemail_ui
+        self.session.on_line_states = self._update_line_key_ui
+
+        # All phone I/O runs on the shared engine; UI updates come back through its Tk pump
+        phone_engine.attach(self._root())
 
         # Track this session in the home page
         self.parent_app = parent
@@ -75,31 +70,20 @@ class CiscoBasePhone(tk.Toplevel):
         
         self.protocol("WM_DELETE_WINDOW", self.on_close)
         self.set_screen_dims()
+        self.renderer = FrameRenderer((self.screen_w, self.screen_h))
         
         self.main_container = tk.Frame(self, bg="#121212")
         self.main_container.pack(fill="both", expand=True)
 
         self.load_config()
-        self.cgi_configs = self.load_cgi_configs()
-        cgi_config = self.cgi_configs.get(self.cgi_config_name, self.cgi_configs.get("default"))
-        self.CGI_USER = cgi_config["user"]
-        self.CGI_PASS = cgi_config["pass"]
         
         print(f"DEBUG: Application using config directory: {get_config_dir()}")
 
-        if not self.setup_ssh():
-            if hasattr(self.parent_app, 'active_sessions'):
-                if self in self.parent_app.active_sessions:
-                    self.parent_app.active_sessions.remove(self)
-            self.destroy()
-            return
-            
+        # The window is usable at once; the connection is made on the engine's startup pool so
+        # several windows (or a whole preset group) connect in parallel without blocking Tk
         self.build_ui()
-        self.check_voicemail()
-        self.check_line_status()
-        self.add_log("system", f"Started Remote Control for {self.phone_ip}")
-        self.refresh_loop()
-        self.refresh_screen()
+        self.show_status("CONNECTING...")
+        phone_engine.run_connect(self._connect_thread)
         
         try:
             icon_p = resource_path("icon.ico")
@@ -112,206 +96,115 @@ class CiscoBasePhone(tk.Toplevel):
         self.screen_w, self.screen_h = 480, 272
 
     def add_log(self, category, message):
-        timestamp = datetime.now().strftime("%H:%M:%S.%f")[:-3]
-        text = f"[{timestamp}] [{category.upper()}] {message}\n"
-        entry = {"type": "text", "content": text}
-        self.log_history.append(entry)
-        self._append_to_log_widget(entry)
+        self.session.add_log(category, message)
 
-    def add_image_log(self, img):
-        thumb_w = 120
-        thumb_h = int(thumb_w * self.screen_h / self.screen_w)
-        log_img = img.resize((thumb_w, thumb_h), Image.Resampling.LANCZOS)
-        photo = ImageTk.PhotoImage(log_img)
-        entry = {"type": "image", "content": photo}
-        self.log_history.append(entry)
+    def add_image_log(self, thumb):
+        buf = io.BytesIO()
+        thumb.save(buf, format="PNG", optimize=True)
+        entry = self.log_store.add_image(buf.getvalue())
         self._append_to_log_widget(entry)
 
     def _append_to_log_widget(self, entry):
-        def _task():
-            if not self.winfo_exists(): 
+        if self.log_extra_window is None:
+            return
+        # Entries are buffered and drained by one timer, not one Tk callback per message
+        with self.log_pending_lock:
+            self.log_pending.append(entry)
+            if self.log_flush_scheduled:
                 return
-            if self.log_extra_window and self.log_extra_window.winfo_exists():
-                try:
-                    self.log_txt.config(state=tk.NORMAL)
-                    if entry["type"] == "text":
-                        self.log_txt.insert(tk.END, entry["content"])
-                    elif entry["type"] == "image":
-                        self.log_txt.image_create(tk.END, image=entry["content"])
-                        self.log_txt.insert(tk.END, "\n")
-                    self.log_txt.config(state=tk.DISABLED)
-                    self.log_txt.see(tk.END)
-                except Exception:
-                    pass
-        self.after(0, _task)
+            self.log_flush_scheduled = True
+        phone_engine.post(self._schedule_log_flush)
 
-    def load_config(self):
-        self.add_log("config_load", f"Attempting to load config from {self.config_file}")
-        try:
-            if os.path.exists(self.config_file):
-                self.add_log("config_load", f"Config file found at {self.config_file}")
-                with open(self.config_file, 'r') as f:
-                    self.config = json.load(f)
-                self.add_log("config_load", f"Config loaded successfully from {self.config_file}")
-            else:
-                self.add_log("config_load", f"Config file not found at {self.config_file}. Checking fallback path.")
-                fallback_path = resource_path(f"config/keys_{self.device_type}.json")
-                if os.path.exists(fallback_path):
-                    self.add_log("config_load", f"Fallback config found at {fallback_path}")
-                    with open(fallback_path, 'r') as f:
-                        self.config = json.load(f)
-                    self.add_log("config_load", f"Fallback config loaded successfully from {fallback_path}")
-                else:
-                    self.config = {}
-                    self.add_log("warning", f"No config file found. Loading empty default config.")
-        except json.JSONDecodeError as e: 
-            self.config = {}
-            self.add_log("error", f"JSON decoding error in {self.config_file}: {e}. Loading empty default config.")
-        except Exception as e: 
-            self.config = {}
-            self.add_log("error", f"Error loading {self.config_file}: {e}. Loading empty default config.")
-
-    def load_ssh_configs(self):
-        ssh_conf_path = os.path.join(get_config_dir(), "ssh.conf")
-        self.add_log("config_load", f"Attempting to load SSH configs from {ssh_conf_path}")
-        if os.path.exists(ssh_conf_path):
-            self.add_log("config_load", f"SSH config file found at {ssh_conf_path}")
-            try:
-                with open(ssh_conf_path, 'r') as f:
-                    configs = json.load(f)
-                self.add_log("config_load", f"SSH configs loaded successfully from {ssh_conf_path}")
-                return configs
-            except json.JSONDecodeError as e:
-                self.add_log("error", f"JSON decoding error in {ssh_conf_path}: {e}. Loading default SSH config.")
-                return {"default": {"host": "127.0.0.1", "user": "admin", "pass": "password"}}
-            except Exception as e:
-                self.add_log("error", f"Error loading SSH configs from {ssh_conf_path}: {e}. Loading default SSH config.")
-                return {"default": {"host": "127.0.0.1", "user": "admin", "pass": "password"}}
-        else:
-            self.add_log("warning", f"SSH config file not found at {ssh_conf_path}. Loading default SSH config.")
-            return {"default": {"host": "127.0.0.1", "user": "admin", "pass": "password"}}
-
-    def load_cgi_configs(self):
-        cgi_conf_path = os.path.join(get_config_dir(), "cgi.conf")
-        self.add_log("config_load", f"Attempting to load CGI configs from {cgi_conf_path}")
-        if os.path.exists(cgi_conf_path):
-            self.add_log("config_load", f"CGI config file found at {cgi_conf_path}")
+    def _schedule_log_flush(self):
+        if self.winfo_exists():
+            self.after(self.log_flush_ms, self._flush_log_widget)
+
+    def _flush_log_widget(self):
+        with self.log_pending_lock:
+            batch = [self.log_pending.popleft() for _ in range(min(self.log_flush_batch, len(self.log_pending)))]
+            more = bool(self.log_pending)
+            self.log_flush_scheduled = more
+        if not self.winfo_exists():
+            return
+        if batch and self.log_extra_window and self.log_extra_window.winfo_exists():
             try:
-                with open(cgi_conf_path, 'r') as f:
-                    configs = json.load(f)
-                self.add_log("config_load", f"CGI configs loaded successfully from {cgi_conf_path}")
-                return configs
-            except json.JSONDecodeError as e:
-                self.add_log("error", f"JSON decoding error in {cgi_conf_path}: {e}. Loading default CGI config.")
-                return {"default": {"user": "admin", "pass": "admin"}}
-            except Exception as e:
-                self.add_log("error", f"Error loading CGI configs from {cgi_conf_path}: {e}. Loading default CGI config.")
-                return {"default": {"user": "admin", "pass": "admin"}}
-        else:
-            self.add_log("warning", f"CGI config file not found at {cgi_conf_path}. Loading default CGI config.")
-            return {"default": {"user": "admin", "pass": "admin"}}
+                self.log_extra_window.append(batch)
+            except Exception:
+                pass
+        if more:
+            self.after(self.log_flush_ms, self._flush_log_widget)
 
-    def setup_ssh(self):
-        if self.connection_mode == "local":
-            self.add_log("system", "Using local/direct connection mode")
-            return True
-        
-        self.ssh_configs = self.load_ssh_configs()
-        config = self.ssh_configs.get(self.ssh_config_name, self.ssh_configs.get("default"))
-        self.SSH_HOST = config["host"]
-        self.SSH_USER = config["user"]
-        self.SSH_PASS = config["pass"]
-        
-        self.add_log("system", f"Connecting to SSH Host: {self.SSH_HOST} (Profile: {self.ssh_config_name})...")
-        self.ssh = paramiko.SSHClient()
-        self.ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-        
+    def load_config(self):
+        self.config = self.session.load_config()
+
+    def show_status(self, text):
+        if hasattr(self, 'countdown_label') and self.countdown_label.winfo_exists():
+            self.countdown_label.config(text=text)
+
+    def _connect_thread(self):
         try:
-            # Use banner_timeout and auth_timeout to prevent hanging
-            self.ssh.connect(
-                self.SSH_HOST, 
-                username=self.SSH_USER, 
-                password=self.SSH_PASS, 
-                timeout=10,
-                banner_timeout=10,
-                auth_timeout=10,
-                look_for_keys=False,
-                allow_agent=False
-            )
-            self.add_log("system", "SSH Connection Established")
-            return True
-        except paramiko.AuthenticationException:
+            self.session.connect()
+        except Exception as e:
+            phone_engine.post(self._on_connect_failed, e)
+            return
+        phone_engine.post(self._on_connected)
+
+    def _on_connected(self):
+        if not self.winfo_exists():
+            self.session.close()
+            return
+        self.check_line_info()
+        self.add_log("system", f"Started Remote Control for {self.phone_ip}")
+        self.refresh_loop()
+        self.refresh_screen()
+
+    def _on_connect_failed(self, e):
+        self.session.close()
+        if hasattr(self.parent_app, 'active_sessions') and self in self.parent_app.active_sessions:
+            self.parent_app.active_sessions.remove(self)
+        if not self.winfo_exists():
+            return
+        if isinstance(e, paramiko.AuthenticationException):
             self.add_log("error", "SSH Authentication Failed - Check username/password")
-            messagebox.showerror("SSH Authentication Error", f"Failed to authenticate to SSH bridge: {self.ssh_config_name}\n\nPlease check your username and password in the SSH configuration.")
-            return False
-        except paramiko.SSHException as e:
+            messagebox.showerror("SSH Authentication Error", f"Failed to authenticate to SSH bridge: {self.ssh_config_name}\n\nPlease check your username and password in the SSH configuration.", parent=self)
+        elif isinstance(e, paramiko.SSHException):
             self.add_log("error", f"SSH Error: {e}")
-            messagebox.showerror("SSH Error", f"SSH connection error: {str(e)}")
-            return False
-        except Exception as e: 
-            self.add_log("error", f"SSH Connection Failed: {e}")
-            messagebox.showerror("SSH Connection Error", f"Failed to connect to SSH bridge: {self.ssh_config_name}\n\nError: {str(e)}")
-            return False
-
-    def exec_cmd(self, cmd):
-        if self.connection_mode == "local":
-            try:
-                result = subprocess.run(cmd, shell=True, capture_output=True, text=True, timeout=30)
-                return result.stdout.encode(), result.stderr.encode()
-            except subprocess.TimeoutExpired:
-                return b"", b"Command timed out"
-            except Exception as e:
-                return b"", str(e).encode()
+            messagebox.showerror("SSH Error", f"SSH connection error: {str(e)}", parent=self)
         else:
-            stdin, stdout, stderr = self.ssh.exec_command(cmd)
-            return stdout.read(), stderr.read()
+            self.add_log("error", f"SSH Connection Failed: {e}")
+            messagebox.showerror("SSH Connection Error", f"Failed to connect to SSH bridge: {self.ssh_config_name}\n\nError: {str(e)}", parent=self)
+        self.destroy()
 
     def refresh_screen(self):
-        if self.is_refreshing: 
+        self.session.refresh(fresh=True)
+
+    def _render_frame(self, img_data):
+        # Runs on the engine's CPU pool: decode and resize here, only the PhotoImage is built on the Tk thread
+        img = decode_frame(img_data)
+        if not self.session.frame_diff.pixels_changed(img):
             return
-        self.waiting_for_image = True 
-        threading.Thread(target=self._fetch_image_thread, daemon=True).start()
-        self.check_voicemail()
-        self.check_line_status()
-
-    def _fetch_image_thread(self):
-        self.is_refreshing = True
-        cmd = f"curl -s -u {self.CGI_USER}:{self.CGI_PASS} http://{self.phone_ip}/CGI/Screenshot"
-        try:
-            img_data, err_data = self.exec_cmd(cmd)
-            if img_data and len(img_data) > 500:
-                img = Image.open(io.BytesIO(img_data))
-                self.add_image_log(img)
-                img_display = img.resize((self.screen_w, self.screen_h), Image.Resampling.LANCZOS)
-                photo = ImageTk.PhotoImage(img_display)
-                self.after(0, self._update_canvas, photo)
-            else:
-                err_msg = err_data.decode().strip() if err_data else "No data received"
-                self.add_log("error", f"Screenshot failed. {err_msg}")
-        except Exception as e:
-            self.add_log("error", f"Screenshot error: {e}")
-        finally:
-            self.is_refreshing = False
-            self.waiting_for_image = False 
-            self.time_left = self.refresh_interval 
+        img_display, thumb = self.renderer.render(img)
+        self.add_image_log(thumb)
+        phone_engine.post(self._show_frame, img_display)
 
-    def press(self, uri):
-        if not uri: 
+    def _show_frame(self, img_display):
+        if not self.winfo_exists(): 
             return
-        self.time_left = self.refresh_interval
-        def _send():
-            payload = f"XML=<CiscoIPPhoneExecute><ExecuteItem URL='{uri}'/></CiscoIPPhoneExecute>"
-            cmd = f"curl -s -u {self.CGI_USER}:{self.CGI_PASS} --data-urlencode \"{payload}\" http://{self.phone_ip}/CGI/Execute"
-            self.add_log("key_send", f"CURL: {cmd}")
-            resp_data, err_data = self.exec_cmd(cmd)
-            resp = resp_data.decode().strip() if resp_data else ""
-            err = err_data.decode().strip() if err_data else ""
-            if resp: 
-                self.add_log("cgi_resp", resp)
-            if err: 
-                self.add_log("error", err)
-            self.after(400, self.refresh_screen)
-        threading.Thread(target=_send, daemon=True).start()
+        self._update_canvas(ImageTk.PhotoImage(img_display))
+
+    def press(self, uri):
+        self.session.press(uri)
+
+    def press_sequence(self, uris):
+        self.session.press_sequence(uris)
+
+    def dial(self, number):
+        self.session.dial(number)
+
+    def prompt_dial(self):
+        number = simpledialog.askstring("Dial", "Digits to send (0-9, *, #):", parent=self)
+        if number:
+            self.dial(number.strip())
 
     def _update_canvas(self, photo):
         if not self.winfo_exists(): 
@@ -320,22 +213,8 @@ class CiscoBasePhone(tk.Toplevel):
         if hasattr(self, 'screen_canvas') and self.screen_canvas.winfo_exists():
             self.screen_canvas.create_image(0, 0, anchor="nw", image=self.phone_display)
 
-    def check_voicemail(self):
-        threading.Thread(target=self._check_voicemail_thread, daemon=True).start()
-
-    def _check_voicemail_thread(self):
-        cmd = f"curl -s -u {self.CGI_USER}:{self.CGI_PASS} http://{self.phone_ip}/CGI/LineInfo"
-        self.add_log("voicemail_check", f"CURL: {cmd}")
-        try:
-            data, err = self.exec_cmd(cmd)
-            if data:
-                root = ET.fromstring(data.decode())
-                has_voicemail = any(mw.text == 'YES' for mw in root.iter('MessageWaiting'))
-                self.after(0, self._update_voicemail_ui, has_voicemail)
-            else:
-                self.add_log("error", "Failed to fetch LineInfo")
-        except Exception as e:
-            self.add_log("error", f"Voicemail check error: {e}")
+    def check_line_info(self):
+        self.session.check_line_info()
 
     def _update_voicemail_ui(self, has_voicemail):
         if hasattr(self, 'voicemail_canvas') and self.voicemail_canvas and self.voicemail_canvas.winfo_exists():
@@ -346,61 +225,9 @@ class CiscoBasePhone(tk.Toplevel):
                 self.voicemail_canvas.itemconfig(self.circle_id, fill="black")
                 self.add_log("voicemail_ui", "Voicemail light set to BLACK (No Message)")
     
-    def check_line_status(self):
-        threading.Thread(target=self._check_line_status_thread, daemon=True).start()
-
-    def _check_line_status_thread(self):
-        cmd = f"curl -s -u {self.CGI_USER}:{self.CGI_PASS} http://{self.phone_ip}/CGI/LineInfo"
-        self.add_log("line_status_request", f"CURL: {cmd}")
-        try:
-            data, err = self.exec_cmd(cmd)
-            if data:
-                # Log the raw XML response for debugging
-                xml_str = data.decode()
-                self.add_log("line_status_xml", f"Raw XML response:\n{xml_str[:500]}...")
-                
-                root = ET.fromstring(xml_str)
-                line_icon_states = []
-                
-                # Try multiple possible XML structures
-                # Structure 1: Direct LineIconState elements
-                for icon_state in root.findall('.//LineIconState'):
-                    if icon_state.text:
-                        line_icon_states.append(icon_state.text)
-                        self.add_log("line_status_parse", f"Found LineIconState: {icon_state.text}")
-                
-                # Structure 2: Inside CiscoIPPhoneLine elements
-                if not line_icon_states:
-                    for line in root.findall('.//CiscoIPPhoneLine'):
-                        icon_state = line.find('LineIconState')
-                        if icon_state is not None and icon_state.text:
-                            line_icon_states.append(icon_state.text)
-                        else:
-                            line_icon_states.append("UNKNOWN")
-                
-                # Structure 3: Inside Line elements
-                if not line_icon_states:
-                    for line in root.findall('.//Line'):
-                        icon_state = line.find('LineIconState')
-                        if icon_state is not None and icon_state.text:
-                            line_icon_states.append(icon_state.text)
-                        else:
-                            line_icon_states.append("UNKNOWN")
-                
-                self.add_log("line_status_response", f"Found {len(line_icon_states)} line states: {line_icon_states}")
-                
-                if line_icon_states:
-                    self.after(0, self._update_line_key_ui, line_icon_states)
-                else:
-                    self.add_log("warning", "No line icon states found in XML response")
-            else:
-                self.add_log("error", "Failed to fetch LineInfo for line status")
-        except Exception as e:
-            self.add_log("error", f"Line status check error: {e}")
-
-    def _update_line_key_ui(self, line_icon_states):
-        self.add_log("line_key_ui", f"Updating {len(line_icon_states)} line keys from {len(self.line_key_buttons)} buttons")
-        for i, icon_state in enumerate(line_icon_states):
+    def _update_line_key_ui(self, changed_states):
+        # Only lines whose state changed since the last poll are passed in
+        for i, icon_state in sorted(changed_states.items()):
             if i < len(self.line_key_buttons):
                 button = self.line_key_buttons[i]
                 if button and button.winfo_exists():
@@ -415,49 +242,118 @@ class CiscoBasePhone(tk.Toplevel):
 
     def toggle_logs(self):
         if self.log_extra_window is None or not self.log_extra_window.winfo_exists():
-            self.log_extra_window = tk.Toplevel(self)
-            self.log_extra_window.title(f"Logs - {self.phone_ip}")
-            self.log_extra_window.geometry("600x400")
-            self.log_txt = scrolledtext.ScrolledText(
-                self.log_extra_window, 
-                bg="#000", 
-                fg="#0F0", 
-                font=("Consolas", 9), 
-                state=tk.DISABLED
-            )
-            self.log_txt.pack(fill="both", expand=True)
-            self.log_txt.config(state=tk.NORMAL)
-            for entry in self.log_history:
-                if entry["type"] == "text":
-                    self.log_txt.insert(tk.END, entry["content"])
-                elif entry["type"] == "image":
-                    self.log_txt.image_create(tk.END, image=entry["content"])
-                    self.log_txt.insert(tk.END, "\n")
-            self.log_txt.config(state=tk.DISABLED)
-            self.log_txt.see(tk.END)
+            # Only the newest page is rendered; older entries load as the user scrolls up
+            self.log_extra_window = LogViewer(self, self.log_store, f"Logs - {self.phone_ip}", on_close=self.toggle_logs)
         else:
             self.log_extra_window.destroy()
             self.log_extra_window = None
+            with self.log_pending_lock:
+                self.log_pending.clear()
+
+    def toggle_history(self):
+        """Scrub back through the frames this session recorded to disk"""
+        if self.history_window is not None and self.history_window.winfo_exists():
+            self.history_window.destroy()
+            self.history_window = None
+            return
+        history = self.session.history
+        if history is None or len(history) == 0:
+            messagebox.showinfo("Screen History", "No screen changes have been recorded yet.", parent=self)
+            return
+        win = self.history_window = tk.Toplevel(self)
+        win.title(f"Screen History - {self.phone_ip}")
+        win.configure(bg="#121212")
+        win.protocol("WM_DELETE_WINDOW", self.toggle_history)
+        self.history_canvas = tk.Canvas(win, width=self.screen_w, height=self.screen_h, bg="black", highlightthickness=0)
+        self.history_canvas.pack(padx=10, pady=10)
+        self.history_label = tk.Label(win, text="", bg="#121212", fg="#0F0", font=("Consolas", 9))
+        self.history_label.pack()
+        # The slider runs over seconds since the first frame; each move is a bisect into the index
+        self.history_start = history.time_at(0)
+        self.history_scale = tk.Scale(win, from_=0, to=max(1, int(history.time_at(len(history) - 1) - self.history_start)),
+                                      orient="horizontal", length=max(300, self.screen_w), showvalue=False,
+                                      bg="#121212", fg="white", highlightthickness=0,
+                                      command=lambda v: self._show_history_frame(history.find(self.history_start + float(v))))
+        self.history_scale.pack(padx=10)
+        bf = tk.Frame(win, bg="#121212")
+        bf.pack(pady=5)
+        tk.Button(bf, text="◀", width=3, command=lambda: self._step_history(-1)).pack(side="left", padx=2)
+        self.history_play_btn = tk.Button(bf, text="PLAY", width=6, command=self._toggle_history_play)
+        self.history_play_btn.pack(side="left", padx=2)
+        tk.Button(bf, text="▶", width=3, command=lambda: self._step_history(1)).pack(side="left", padx=2)
+        tk.Button(bf, text="LATEST", command=lambda: self._show_history_frame(len(history) - 1, move_slider=True)).pack(side="left", padx=8)
+        self.history_playing = False
+        self._show_history_frame(len(history) - 1, move_slider=True)
+
+    def _show_history_frame(self, index, move_slider=False):
+        history = self.session.history
+        if self.history_window is None or not self.history_window.winfo_exists() or not 0 <= index < len(history):
+            return
+        if index == self.history_index and not move_slider:
+            return
+        self.history_index = index
+        try:
+            display, _ = self.renderer.render(decode_frame(history.read(index)))
+        except Exception as e:
+            self.history_label.config(text=f"Frame {index + 1}: unreadable ({e})")
+            return
+        self.history_photo = ImageTk.PhotoImage(display)
+        self.history_canvas.create_image(0, 0, anchor="nw", image=self.history_photo)
+        stamp = datetime.fromtimestamp(history.time_at(index)).strftime("%Y-%m-%d %H:%M:%S")
+        self.history_label.config(text=f"Frame {index + 1}/{len(history)}  {stamp}")
+        if move_slider:
+            self.history_scale.config(to=max(1, int(history.time_at(len(history) - 1) - self.history_start)))
+            self.history_scale.set(int(history.time_at(index) - self.history_start))
+
+    def _step_history(self, delta):
+        self._show_history_frame(self.history_index + delta, move_slider=True)
+
+    def _toggle_history_play(self):
+        self.history_playing = not self.history_playing
+        self.history_play_btn.config(text="PAUSE" if self.history_playing else "PLAY")
+        if self.history_playing:
+            self._play_history()
+
+    def _play_history(self):
+        history = self.session.history
+        if not self.history_playing or self.history_window is None or not self.history_window.winfo_exists():
+            return
+        nxt = self.history_index + 1
+        if nxt >= len(history):
+            self._toggle_history_play()
+            return
+        self._show_history_frame(nxt, move_slider=True)
+        # Replay at recorded pace, but never sit on a static screen for more than a second
+        gap = history.time_at(nxt) - history.time_at(nxt - 1)
+        self.history_window.after(int(min(max(gap, 0.1), 1.0) * 1000), self._play_history)
 
     def refresh_loop(self):
-        if not self.waiting_for_image:
-            if self.time_left <= 0: 
-                self.refresh_screen()
-            else: 
-                self.time_left -= 1
+        if not self.winfo_exists():
+            return
+        self.session.poll_if_due()
         
         if hasattr(self, 'countdown_label') and self.countdown_label.winfo_exists():
-            status = "FETCHING..." if self.waiting_for_image else f"Next Refresh: {self.time_left}s"
+            breaker = self.session.breaker
+            if self.session.waiting_for_image:
+                status = "FETCHING..."
+            elif breaker.is_open:
+                status = f"UNREACHABLE - retry in {math.ceil(breaker.seconds_left())}s"
+            else:
+                status = f"Next Refresh: {math.ceil(self.session.scheduler.seconds_left())}s"
             self.countdown_label.config(text=status)
-        self.after(1000, self.refresh_loop)
+        self.after(self.refresh_tick_ms, self.refresh_loop)
 
     def reload_btn_config(self):
         self.load_config()
-        self.check_line_status()
+        self.check_line_info()
         for widget in self.main_container.winfo_children(): 
             widget.destroy()
         self.line_key_buttons = []
         self.build_ui()
+        # The rebuilt line keys and lamp start blank; repaint them from the last known states
+        self.session.replay_line_state()
+        # The rebuilt canvas is empty, so the next frame must be drawn even if unchanged
+        self.session.frame_diff.reset()
         self.refresh_screen()
 
     def on_close(self):
@@ -465,11 +361,9 @@ class CiscoBasePhone(tk.Toplevel):
             self.parent_app.active_sessions.remove(self)
         if self.log_extra_window and self.log_extra_window.winfo_exists():
             self.log_extra_window.destroy()
-        if hasattr(self, 'ssh') and self.ssh:
-            try:
-                self.ssh.close()
-            except:
-                pass
+        if self.history_window and self.history_window.winfo_exists():
+            self.history_window.destroy()
+        self.session.close()
         self.destroy()
 
     def build_ui(self):
@@ -481,4 +375,6 @@ class CiscoBasePhone(tk.Toplevel):
         btn_frame = tk.Frame(self.main_container, bg="#121212")
         btn_frame.pack(fill="x", padx=10, pady=5)
         tk.Button(btn_frame, text="Toggle Logs", command=self.toggle_logs).pack(side="left", padx=5)
-        tk.Button(btn_frame, text="Refresh Now", command=self.refresh_screen).pack(side="left", padx=5)
\ No newline at end of file
+        tk.Button(btn_frame, text="Refresh Now", command=self.refresh_screen).pack(side="left", padx=5)
+        tk.Button(btn_frame, text="Dial", command=self.prompt_dial).pack(side="left", padx=5)
+        tk.Button(btn_frame, text="History", command=self.toggle_history).pack(side="left", padx=5)
\ No newline at end of file
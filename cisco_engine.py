@@ -0,0 +1,136 @@
+import asyncio, queue, threading, traceback
+from concurrent.futures import ThreadPoolExecutor
+
+class PhoneEngine:
+    """One background asyncio loop that owns the phone I/O of every open session.
+
+    Native HTTP and local curl are awaited on the loop itself, so a phone that never answers
+    costs a socket, not a thread. Transports that can only block (SSH exec and tunnel channels)
+    run on a worker pool where each jump host may hold at most per_host_blocking workers, and key
+    presses get a pool of their own, so hung phones cannot stall other sites or the keys.
+    CPU work (frame decode, disk writes) goes to a small pool; results that must touch
+    Tk are queued with post() and drained on the Tk thread by a single after() pump.
+    """
+    def __init__(self, workers=4, blocking_workers=32, per_host_blocking=8, key_workers=4, connect_workers=16, pump_ms=30, pump_batch=500):
+        self.workers = workers
+        self.blocking_workers = blocking_workers
+        self.per_host_blocking = per_host_blocking
+        self.key_workers = key_workers
+        self.connect_workers = connect_workers
+        self.pump_ms = pump_ms
+        self.pump_batch = pump_batch
+        self.loop = None
+        self.thread = None
+        self.executor = None
+        self.blocking_executor = None
+        self.key_executor = None
+        self.connect_executor = None
+        self.host_slots = {}
+        self.ui_queue = queue.SimpleQueue()
+        self.tk_root = None
+        self.lock = threading.Lock()
+
+    def start(self):
+        with self.lock:
+            if self.loop is not None:
+                return
+            self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="phone-cpu")
+            self.blocking_executor = ThreadPoolExecutor(max_workers=self.blocking_workers, thread_name_prefix="phone-io")
+            self.key_executor = ThreadPoolExecutor(max_workers=self.key_workers, thread_name_prefix="phone-keys")
+            # Session startup (SSH handshakes, up to the connect timeout each) must not occupy the polling workers
+            self.connect_executor = ThreadPoolExecutor(max_workers=self.connect_workers, thread_name_prefix="phone-connect")
+            self.loop = asyncio.new_event_loop()
+            self.loop.set_default_executor(self.executor)
+            ready = threading.Event()
+            def _run():
+                asyncio.set_event_loop(self.loop)
+                self.loop.call_soon(ready.set)
+                self.loop.run_forever()
+            self.thread = threading.Thread(target=_run, name="phone-engine", daemon=True)
+            self.thread.start()
+            ready.wait()
+
+    def stop(self):
+        with self.lock:
+            if self.loop is None:
+                return
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.thread.join(timeout=2)
+            for executor in (self.executor, self.blocking_executor, self.key_executor, self.connect_executor):
+                executor.shutdown(wait=False, cancel_futures=True)
+            self.loop = None
+            self.thread = None
+            self.executor = None
+            self.blocking_executor = None
+            self.key_executor = None
+            self.connect_executor = None
+            self.host_slots = {}
+
+    def attach(self, tk_root):
+        """Start draining UI callbacks on the Tk thread; safe to call from every window"""
+        self.start()
+        if self.tk_root is None:
+            self.tk_root = tk_root
+            self.tk_root.after(self.pump_ms, self._pump)
+
+    def run(self, func, *args):
+        """Run a blocking function on the engine's CPU pool; returns a concurrent.futures.Future"""
+        self.start()
+        return asyncio.run_coroutine_threadsafe(self._call(func, *args), self.loop)
+
+    def run_connect(self, func, *args):
+        """Like run(), on the separate startup pool; exceptions are left on the returned future"""
+        self.start()
+        return self.connect_executor.submit(func, *args)
+
+    def run_coro(self, coro):
+        """Schedule a coroutine on the loop; cancelling the returned future cancels it"""
+        self.start()
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    async def offload(self, func, *args):
+        """Await CPU-bound or disk work from a coroutine without holding up the loop"""
+        return await self.loop.run_in_executor(self.executor, func, *args)
+
+    async def blocking(self, host_key, func, *args, key=False):
+        """Await a blocking transport call; at most per_host_blocking run at once per jump host"""
+        if key:
+            return await self.loop.run_in_executor(self.key_executor, func, *args)
+        slot = self.host_slots.get(host_key)
+        if slot is None:
+            slot = self.host_slots[host_key] = asyncio.Semaphore(self.per_host_blocking)
+        async with slot:
+            return await self.loop.run_in_executor(self.blocking_executor, func, *args)
+
+    async def _call(self, func, *args):
+        try:
+            return await self.loop.run_in_executor(None, func, *args)
+        except Exception:
+            traceback.print_exc()
+
+    def post(self, func, *args):
+        """Queue a callback for the Tk thread (thread-safe)"""
+        if self.tk_root is None:
+            # Headless use: there is no UI thread, run inline
+            func(*args)
+            return
+        self.ui_queue.put((func, args))
+
+    def _pump(self):
+        # Bounded per tick so a burst of results cannot starve the Tk event loop
+        for _ in range(self.pump_batch):
+            try:
+                func, args = self.ui_queue.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                func(*args)
+            except Exception:
+                traceback.print_exc()
+        try:
+            self.tk_root.after(self.pump_ms, self._pump)
+        except Exception:
+            # Root window destroyed; the app is shutting down
+            self.tk_root = None
+
+phone_engine = PhoneEngine()
@@ -0,0 +1,105 @@
+import os, json, time, asyncio, threading, traceback
+from collections import namedtuple
+
+LINE = "line"            # a line/session key changed state (RINGING, CONNECTED, ONHOLD, ...)
+VOICEMAIL = "voicemail"  # the MessageWaiting lamp turned on or off
+REACHABILITY = "reachability"  # polling gave up on the phone (new=False) or it answered again (new=True)
+EVENT_KINDS = (LINE, VOICEMAIL, REACHABILITY)
+
+class PhoneEvent(namedtuple("PhoneEvent", "kind phone_ip line old new time")):
+    """One state transition on one phone. `line` is the 0-based key index (None for voicemail);
+    `old` is None for the first state seen after a session starts."""
+    __slots__ = ()
+
+    def to_dict(self):
+        return self._asdict()
+
+class _Subscription:
+    def __init__(self, callback, kinds, phone_ip, states):
+        self.callback = callback
+        self.kinds = set(kinds) if kinds else None
+        self.phone_ip = phone_ip
+        self.states = {s.upper() for s in states} if states else None
+
+    def matches(self, event):
+        if self.kinds is not None and event.kind not in self.kinds:
+            return False
+        if self.phone_ip is not None and event.phone_ip != self.phone_ip:
+            return False
+        if self.states is not None and str(event.new).upper() not in self.states:
+            return False
+        return True
+
+class EventBus:
+    """Fan-out of phone state changes from the polling engine to any number of subscribers.
+
+    Callbacks run on the engine loop that detected the change, so they must be quick;
+    use events() for an asyncio consumer or JsonlEventSink to record to disk.
+    """
+    def __init__(self):
+        self.subscriptions = []
+        self.lock = threading.Lock()
+
+    def subscribe(self, callback, kinds=None, phone_ip=None, states=None):
+        """Call `callback(event)` for matching events; `states` filters on the new state, e.g. ["RINGING"]"""
+        sub = _Subscription(callback, kinds, phone_ip, states)
+        with self.lock:
+            # Copy-on-write so publish() can iterate without holding the lock
+            self.subscriptions = self.subscriptions + [sub]
+        return sub
+
+    def unsubscribe(self, sub):
+        with self.lock:
+            self.subscriptions = [s for s in self.subscriptions if s is not sub]
+
+    def publish(self, event):
+        for sub in self.subscriptions:
+            if sub.matches(event):
+                try:
+                    sub.callback(event)
+                except Exception:
+                    traceback.print_exc()
+
+    async def events(self, kinds=None, phone_ip=None, states=None, maxsize=1000):
+        """Async iterator over matching events on the caller's loop; the oldest are dropped if it falls behind"""
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(maxsize)
+        def _put(event):
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(event)
+        sub = self.subscribe(lambda event: loop.call_soon_threadsafe(_put, event), kinds, phone_ip, states)
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            self.unsubscribe(sub)
+
+class JsonlEventSink:
+    """Appends every matching event to a JSON Lines file"""
+    def __init__(self, path, bus=None, kinds=None, phone_ip=None, states=None):
+        self.path = path
+        self.bus = bus or phone_events
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.file = open(path, "a", encoding="utf-8")
+        self.lock = threading.Lock()
+        self.sub = self.bus.subscribe(self.write, kinds, phone_ip, states)
+
+    def write(self, event):
+        line = json.dumps(event.to_dict()) + "\n"
+        with self.lock:
+            if self.file is not None:
+                self.file.write(line)
+                self.file.flush()
+
+    def close(self):
+        self.bus.unsubscribe(self.sub)
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+
+def make_event(kind, phone_ip, line, old, new):
+    return PhoneEvent(kind, phone_ip, line, old, new, time.time())
+
+phone_events = EventBus()
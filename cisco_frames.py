@@ -0,0 +1,143 @@
+import hashlib, io, re, struct
+
+def frame_digest(data):
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+def image_info(data):
+    """Format and dimensions of a Screenshot payload, read from its header without decoding pixels"""
+    head = bytes(data[:64])
+    if head.startswith(b"\x89PNG\r\n\x1a\n") and len(head) >= 24:
+        width, height = struct.unpack(">II", head[16:24])
+        return "png", width, height
+    if head.startswith(b"BM") and len(head) >= 26:
+        width, height = struct.unpack("<ii", head[18:26])
+        return "bmp", width, abs(height)
+    if b"CiscoIPPhoneImage" in bytes(data[:512]):
+        # 79xx CIP: XML with Width/Height elements and hex-packed 2-bit pixels
+        text = bytes(data[:1024]).decode("ascii", errors="replace")
+        w = re.search(r"<Width>\s*(\d+)", text)
+        h = re.search(r"<Height>\s*(\d+)", text)
+        return "cip", int(w.group(1)) if w else 0, int(h.group(1)) if h else 0
+    return "bin", 0, 0
+
+# CIP packs four 2-bit pixels per byte, leftmost pixel in the low bits, 3 = black.
+# Pillow's "L;2" unpacker wants the leftmost pixel in the high bits and 3 = white,
+# so every byte is remapped once through this table (bytes.translate runs in C).
+_CIP_TO_L2 = bytes(
+    sum(((b >> (2 * i) & 3) ^ 3) << (6 - 2 * i) for i in range(4)) for b in range(256)
+)
+
+def decode_frame(data):
+    """Decode a Screenshot payload (PNG, BMP or 79xx CIP) into a PIL image without copying the bytes"""
+    from PIL import Image
+    if b"CiscoIPPhoneImage" in bytes(data[:512]):
+        return decode_cip(data)
+    # BytesIO shares an immutable bytes buffer instead of copying it
+    return Image.open(io.BytesIO(data))
+
+def decode_cip(data):
+    from PIL import Image
+    text = bytes(data).decode("ascii", errors="replace")
+    width = int(re.search(r"<Width>\s*(\d+)", text).group(1))
+    height = int(re.search(r"<Height>\s*(\d+)", text).group(1))
+    hex_data = re.search(r"<Data>\s*([0-9A-Fa-f\s]*?)\s*</Data>", text).group(1)
+    packed = bytes.fromhex(hex_data).translate(_CIP_TO_L2)
+    count = width * height
+    if width % 4 == 0:
+        return Image.frombytes("L", (width, height), packed, "raw", "L;2")
+    # Rows are not byte aligned: unpack the whole stream as one row, then fold it
+    line = Image.frombytes("L", (len(packed) * 4, 1), packed, "raw", "L;2").tobytes()
+    return Image.frombytes("L", (width, height), line[:count].ljust(count, b"\xff"))
+
+class FrameRenderer:
+    """Turns decoded frames into the display image and the log thumbnail for one phone model"""
+    def __init__(self, display_size, thumb_width=120):
+        self.display_size = display_size
+        self.thumb_size = (thumb_width, int(thumb_width * display_size[1] / display_size[0]))
+        # Palette bytes -> index-to-grey table (None for colour palettes); 79xx phones send the same palette every frame
+        self.palette_luts = {}
+
+    def _normalize(self, img):
+        if img.mode == "P":
+            if img.size == self.display_size:
+                # Shown as is: Tk takes palette images directly, so there is nothing to convert
+                img.load()
+                return img
+            return self._from_palette(img)
+        if img.mode in ("1", "L", "RGB"):
+            return img
+        return img.convert("RGB")
+
+    def _from_palette(self, img):
+        from PIL import Image
+        palette = img.getpalette() or []
+        key = bytes(palette)
+        if key not in self.palette_luts:
+            rgb = [palette[i:i + 3] for i in range(0, len(palette), 3)]
+            grey = all(c[0] == c[1] == c[2] for c in rgb)
+            self.palette_luts[key] = [c[0] for c in rgb] + [0] * (256 - len(rgb)) if grey else None
+        lut = self.palette_luts[key]
+        if lut is None:
+            return img.convert("RGB")
+        # Index bytes read as "L" and mapped through the cached table: no per-frame palette conversion
+        return Image.frombytes("L", img.size, img.tobytes()).point(lut)
+
+    def _scale(self, img, size):
+        from PIL import Image
+        if img.size == size:
+            return img
+        (sw, sh), (dw, dh) = img.size, size
+        if dw % sw == 0 and dh % sh == 0 and dw // sw == dh // sh:
+            return img.resize(size, Image.Resampling.NEAREST)
+        if sw % dw == 0 and sh % dh == 0 and sw // dw == sh // dh:
+            return img.reduce(sw // dw)
+        return img.resize(size, Image.Resampling.LANCZOS, reducing_gap=3.0)
+
+    def render(self, img):
+        """Return (display, thumbnail); the thumbnail is derived from the already scaled display image"""
+        from PIL import Image
+        display = self._scale(self._normalize(img), self.display_size)
+        if display.mode == "1":
+            # Bilinear thumbnails of 1-bit frames need grey levels
+            display = display.convert("L")
+        if display.mode == "P":
+            # Palette frames shown unconverted: the thumbnail picks palette entries, as Pillow would anyway
+            return display, display.resize(self.thumb_size, Image.Resampling.NEAREST)
+        thumb = display.resize(self.thumb_size, Image.Resampling.BILINEAR, reducing_gap=2.0)
+        return display, thumb
+
+class FrameDiff:
+    """Remembers the last screenshot so unchanged frames can skip decode, resize and redraw"""
+    def __init__(self, compare_pixels=False):
+        # Pixel comparison catches phones that re-encode an identical screen into different bytes
+        self.compare_pixels = compare_pixels
+        self.last_payload = None
+        self.last_pixels = None
+        self.unchanged_count = 0
+
+    def reset(self):
+        self.last_payload = None
+        self.last_pixels = None
+        self.unchanged_count = 0
+
+    def payload_changed(self, data):
+        digest = frame_digest(data)
+        if digest == self.last_payload:
+            self.unchanged_count += 1
+            return False
+        self.last_payload = digest
+        return True
+
+    def pixels_changed(self, img):
+        if not self.compare_pixels:
+            return True
+        digest = frame_digest(img.tobytes())
+        if digest == self.last_pixels:
+            self.unchanged_count += 1
+            return False
+        self.last_pixels = digest
+        self.unchanged_count = 0
+        return True
+
+    def mark_changed(self):
+        self.unchanged_count = 0
@@ -0,0 +1,104 @@
+import os, struct, threading, time
+from array import array
+from bisect import bisect_right
+from cisco_frames import frame_digest
+
+# timestamp, offset into the .frames file, payload length, payload digest
+INDEX_RECORD = struct.Struct("<dQI16s")
+
+class FrameHistory:
+    """Append-only screenshot history: raw payloads in <base>.frames, a fixed-size time index in <base>.idx.
+
+    Identical frames are stored once; every change still gets an index record pointing at the
+    existing payload, so scrubbing shows the screen exactly as it was at that moment.
+    """
+    def __init__(self, base_path):
+        self.frames_path = base_path + ".frames"
+        self.index_path = base_path + ".idx"
+        self.times = array("d")
+        self.records = []
+        self.blobs = {}
+        self.frames_size = 0
+        self.frames_file = None
+        self.index_file = None
+        self.reader = None
+        self.disabled = False
+        self.lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        # Reopening an existing history rebuilds the index and dedupe map without touching the payloads
+        if not os.path.exists(self.index_path):
+            return
+        try:
+            with open(self.index_path, "rb") as f:
+                raw = f.read()
+            self.frames_size = os.path.getsize(self.frames_path)
+        except OSError:
+            return
+        usable = len(raw) - len(raw) % INDEX_RECORD.size
+        for timestamp, offset, length, digest in INDEX_RECORD.iter_unpack(raw[:usable]):
+            if offset + length > self.frames_size:
+                break
+            self.times.append(timestamp)
+            self.records.append((offset, length))
+            self.blobs[digest] = (offset, length)
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.frames_path) or ".", exist_ok=True)
+        self.frames_file = open(self.frames_path, "ab")
+        self.index_file = open(self.index_path, "ab")
+
+    def append(self, data, timestamp=None, digest=None):
+        if self.disabled:
+            return
+        timestamp = time.time() if timestamp is None else timestamp
+        digest = digest or frame_digest(data)
+        with self.lock:
+            try:
+                if self.frames_file is None:
+                    self._open()
+                blob = self.blobs.get(digest)
+                if blob is None:
+                    blob = (self.frames_size, len(data))
+                    self.frames_file.write(data)
+                    # Payload first, so an index record never points past the end of the data file
+                    self.frames_file.flush()
+                    self.frames_size += len(data)
+                    self.blobs[digest] = blob
+                self.index_file.write(INDEX_RECORD.pack(timestamp, blob[0], blob[1], digest))
+                self.index_file.flush()
+                self.times.append(timestamp)
+                self.records.append(blob)
+            except OSError:
+                # History is best effort; a full or read-only disk must not break the session
+                self.disabled = True
+
+    def __len__(self):
+        return len(self.times)
+
+    def find(self, timestamp):
+        """Index of the frame on screen at `timestamp` (the last one recorded at or before it)"""
+        with self.lock:
+            return max(0, bisect_right(self.times, timestamp) - 1) if self.times else -1
+
+    def time_at(self, index):
+        return self.times[index]
+
+    def read(self, index):
+        with self.lock:
+            offset, length = self.records[index]
+            if self.reader is None:
+                self.reader = open(self.frames_path, "rb")
+            self.reader.seek(offset)
+            return self.reader.read(length)
+
+    def close(self):
+        with self.lock:
+            for f in (self.frames_file, self.index_file, self.reader):
+                if f is not None:
+                    try:
+                        f.close()
+                    except OSError:
+                        pass
+            self.frames_file = self.index_file = self.reader = None
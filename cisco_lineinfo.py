@@ -0,0 +1,96 @@
+from xml.parsers import expat
+
+# LineInfo layouts seen across firmware, in detection order:
+#   "CiscoIPPhoneLine" / "Line": one container per line, state in the first LineIconState inside it
+#   "icon-states": bare LineIconState elements anywhere in the document
+# Containers win when present: they keep a slot (UNKNOWN) for lines that report no state.
+SCHEMAS = ("CiscoIPPhoneLine", "Line", "icon-states")
+_CONTAINERS = ("CiscoIPPhoneLine", "Line")
+_TEXT_TAGS = ("LineIconState", "MessageWaiting")
+
+class LineInfoParser:
+    """Single-pass /CGI/LineInfo reader that remembers which layout this phone's firmware returns.
+
+    The response bytes go straight through expat without building a tree. Character data and end
+    events are only hooked up inside LineIconState/MessageWaiting, and once the layout is cached
+    the other layouts are not collected at all.
+    """
+    def __init__(self):
+        self.schema = None
+
+    def parse(self, data):
+        """Return (has_voicemail, line_states) from the raw response bytes"""
+        if self.schema is not None:
+            has_voicemail, found = self._scan(data, (self.schema,))
+            if found[self.schema]:
+                return has_voicemail, found[self.schema]
+        # First poll, or the cached layout came back empty (firmware upgrade): detect again
+        has_voicemail, found = self._scan(data, SCHEMAS)
+        self.schema = next((name for name in SCHEMAS if found[name]), None)
+        return has_voicemail, found[self.schema] if self.schema else []
+
+    def _scan(self, data, layouts):
+        """One expat pass collecting MessageWaiting and the line states of the requested layouts"""
+        parser = expat.ParserCreate()
+        parser.buffer_text = True
+        icons = [] if "icon-states" in layouts else None
+        lines = {tag: [] for tag in _CONTAINERS if tag in layouts}
+        voicemail = False
+        current = []  # states list of the most recently opened container
+        capture = []  # character data of the LineIconState/MessageWaiting being read
+        # Called for every element: anything outside this set costs one membership test
+        watched = frozenset(_TEXT_TAGS).union(lines)
+
+        def start(name, attrs):
+            if name not in watched:
+                return
+            if name in _TEXT_TAGS:
+                capture.clear()
+                parser.CharacterDataHandler = capture.append
+                parser.EndElementHandler = end
+            else:
+                states = lines[name]
+                states.append(None)
+                current[:] = [states]
+
+        def end(name):
+            nonlocal voicemail
+            parser.CharacterDataHandler = None
+            parser.EndElementHandler = None
+            text = "".join(capture)
+            if name == "MessageWaiting":
+                voicemail = voicemail or text == "YES"
+                return
+            if icons is not None and text:
+                icons.append(text)
+            # A container takes the first LineIconState after it opens
+            if current and current[0][-1] is None:
+                current[0][-1] = text or "UNKNOWN"
+
+        parser.StartElementHandler = start
+        parser.Parse(data, True)
+        found = {tag: [s or "UNKNOWN" for s in states] for tag, states in lines.items()}
+        if icons is not None:
+            found["icon-states"] = icons
+        return voicemail, found
+
+class LineStateTracker:
+    """Last known voicemail lamp and line key states of one phone; update() reports only transitions"""
+    def __init__(self):
+        self.voicemail = None
+        self.lines = ()
+
+    def update(self, has_voicemail, states):
+        """Return (voicemail_changed, {line index: (old state, new state)})"""
+        voicemail_changed = has_voicemail != self.voicemail
+        self.voicemail = has_voicemail
+        states = tuple(states)
+        changes = {}
+        if states != self.lines:
+            old = self.lines
+            for i, state in enumerate(states):
+                previous = old[i] if i < len(old) else None
+                if state != previous:
+                    changes[i] = (previous, state)
+            self.lines = states
+        return voicemail_changed, changes
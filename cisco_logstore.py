@@ -0,0 +1,307 @@
+import os, re, json, time, shutil, atexit, threading, logging, logging.handlers, queue
+from collections import deque, Counter
+from datetime import datetime
+
+LEVELS = {"debug": logging.DEBUG, "info": logging.INFO, "warning": logging.WARNING, "error": logging.ERROR, "off": logging.CRITICAL + 10}
+
+# Chatty per-poll categories are debug so they can be silenced without losing errors
+CATEGORY_LEVELS = {
+    "error": "error",
+    "warning": "warning",
+    "config_load": "debug",
+    "build_ui": "debug",
+    "line_status_request": "debug",
+    "line_status_xml": "debug",
+    "line_status_parse": "debug",
+    "line_key_ui": "debug",
+    "voicemail_ui": "debug",
+}
+
+def category_level(category):
+    return LEVELS[CATEGORY_LEVELS.get(category, "info")]
+
+_WORD = re.compile(r"\w+")
+
+def _tokens(entry):
+    if entry["type"] != "text":
+        return set()
+    return set(_WORD.findall(entry["content"].lower()))
+
+def verbosity_threshold(verbosity, category):
+    """Minimum level kept for a category; `verbosity` maps categories (or "*") to a level name, default info"""
+    return LEVELS.get(verbosity.get(category, verbosity.get("*", "info")), logging.INFO)
+
+class LogStore:
+    """Bounded in-memory session log; entries beyond the entry/byte caps are spilled to a file on disk.
+
+    Evicted batches are handed to the process-wide spill_writer thread, so append() never touches
+    the disk on the logging thread (the engine loop or the Tk thread).
+    """
+    def __init__(self, max_entries=2000, max_bytes=4 * 1024 * 1024, spill_path=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.spill_path = spill_path
+        self.entries = deque()
+        self.total_bytes = 0
+        self.spilled = 0
+        self.spilled_images = 0
+        self.next_seq = 0
+        self.category_counts = Counter()
+        # Word -> entry seqs; built lazily on the first search and then kept up to date incrementally
+        self.word_index = None
+        self.indexed_seq = 0
+        self.lock = threading.Lock()
+
+    def _size(self, entry):
+        content = entry["content"]
+        return len(content) if isinstance(content, (bytes, bytearray)) else len(content.encode())
+
+    def append(self, entry):
+        with self.lock:
+            entry["seq"] = self.next_seq
+            self.next_seq += 1
+            self.category_counts[entry.get("category", "")] += 1
+            self.entries.append(entry)
+            self.total_bytes += self._size(entry)
+            evicted = []
+            if len(self.entries) > self.max_entries or self.total_bytes > self.max_bytes:
+                # Evict down to 90% of the caps so the spill file is appended in batches, not per entry
+                keep_entries = self.max_entries * 9 // 10
+                keep_bytes = self.max_bytes * 9 // 10
+                while self.entries and (len(self.entries) > keep_entries or self.total_bytes > keep_bytes):
+                    old = self.entries.popleft()
+                    self.total_bytes -= self._size(old)
+                    self._forget(old)
+                    evicted.append(old)
+            if evicted:
+                self.spilled += len(evicted)
+                if self.spill_path:
+                    spill_writer.submit(self, evicted)
+        return entry
+
+    def add_text(self, text, **fields):
+        return self.append({"type": "text", "content": text, **fields})
+
+    def add_image(self, png_bytes):
+        """Thumbnails are kept as compressed PNG bytes, not Tk images"""
+        return self.append({"type": "image", "category": "screenshot", "content": png_bytes, "time": datetime.now().strftime("%H:%M:%S.%f")[:-3]})
+
+    def snapshot(self):
+        with self.lock:
+            return list(self.entries)
+
+    def categories(self):
+        with self.lock:
+            return sorted(c for c, n in self.category_counts.items() if n > 0 and c)
+
+    def _forget(self, entry):
+        self.category_counts[entry.get("category", "")] -= 1
+        if self.word_index is not None and entry["seq"] < self.indexed_seq:
+            for word in _tokens(entry):
+                seqs = self.word_index.get(word)
+                if seqs is not None:
+                    seqs.discard(entry["seq"])
+                    if not seqs:
+                        del self.word_index[word]
+
+    def _update_index(self):
+        if self.word_index is None:
+            self.word_index = {}
+        pending = self.next_seq - self.indexed_seq
+        if pending <= 0:
+            return
+        start = max(0, len(self.entries) - pending)
+        for i in range(start, len(self.entries)):
+            entry = self.entries[i]
+            for word in _tokens(entry):
+                self.word_index.setdefault(word, set()).add(entry["seq"])
+        self.indexed_seq = self.next_seq
+
+    def query(self, category=None, text=None):
+        """Entries matching a category and/or a case-insensitive substring, oldest first.
+
+        Text search narrows candidates through the word index (query words are matched against
+        indexed words by substring), then confirms the full phrase only on those entries.
+        """
+        with self.lock:
+            entries = list(self.entries)
+            if not text:
+                return [e for e in entries if not category or e.get("category") == category]
+            self._update_index()
+            candidates = None
+            for qword in _WORD.findall(text.lower()):
+                seqs = set()
+                for word, word_seqs in self.word_index.items():
+                    if qword in word:
+                        seqs |= word_seqs
+                candidates = seqs if candidates is None else candidates & seqs
+                if not candidates:
+                    return []
+        needle = text.lower()
+        return [e for e in entries
+                if (candidates is None or e["seq"] in candidates)
+                and (not category or e.get("category") == category)
+                and e["type"] == "text" and needle in e["content"].lower()]
+
+    def _write_spill(self, evicted):
+        # Runs on the spill writer thread only
+        if not self.spill_path:
+            return
+        try:
+            spill_dir = os.path.dirname(self.spill_path)
+            if spill_dir:
+                os.makedirs(spill_dir, exist_ok=True)
+            with open(self.spill_path, "a", encoding="utf-8") as f:
+                for entry in evicted:
+                    if entry["type"] == "text":
+                        f.write(entry["content"])
+                    else:
+                        thumb_dir = os.path.splitext(self.spill_path)[0] + "_thumbs"
+                        os.makedirs(thumb_dir, exist_ok=True)
+                        name = f"{self.spilled_images:06d}.png"
+                        self.spilled_images += 1
+                        with open(os.path.join(thumb_dir, name), "wb") as img_f:
+                            img_f.write(entry["content"])
+                        f.write(f"[{entry['time']}] [IMAGE] {name}\n")
+        except OSError:
+            # Spilling is best effort; never let log housekeeping break the session
+            self.spill_path = None
+
+_SESSION_SUFFIXES = (".log", ".frames", ".idx", "_thumbs")
+
+def prune_log_dir(log_dir, max_bytes, max_age_days, skip=(), min_idle=600):
+    """Delete old session spill logs, thumbnails and frame histories, oldest session first.
+
+    A session's files (<base>.log, .frames, .idx and the <base>_thumbs folder) go together once the
+    session is older than max_age_days or the directory is over max_bytes. Bases in `skip` and
+    sessions written to within min_idle seconds (possibly open in another process) are kept.
+    phones.jsonl is left to its own rotation.
+    """
+    sessions = {}
+    try:
+        names = os.listdir(log_dir)
+    except OSError:
+        return 0
+    for name in names:
+        base = next((name[:-len(sfx)] for sfx in _SESSION_SUFFIXES if name.endswith(sfx)), None)
+        if base is None or name.startswith("phones.jsonl"):
+            continue
+        path = os.path.join(log_dir, name)
+        try:
+            if os.path.isdir(path):
+                stats = [e.stat() for e in os.scandir(path) if e.is_file()] or [os.stat(path)]
+            else:
+                stats = [os.stat(path)]
+        except OSError:
+            continue
+        group = sessions.setdefault(base, {"paths": [], "size": 0, "mtime": 0.0})
+        group["paths"].append(path)
+        group["size"] += sum(st.st_size for st in stats)
+        group["mtime"] = max([group["mtime"]] + [st.st_mtime for st in stats])
+
+    now = time.time()
+    total = sum(g["size"] for g in sessions.values())
+    removed = 0
+    for base, group in sorted(sessions.items(), key=lambda item: item[1]["mtime"]):
+        expired = now - group["mtime"] > max_age_days * 86400
+        if not expired and total <= max_bytes:
+            break
+        if base in skip or now - group["mtime"] < min_idle:
+            continue
+        for path in group["paths"]:
+            try:
+                if os.path.isdir(path):
+                    shutil.rmtree(path)
+                else:
+                    os.remove(path)
+            except OSError:
+                # Still open elsewhere (Windows) or already gone
+                pass
+        total -= group["size"]
+        removed += 1
+    return removed
+
+class SpillWriter:
+    """Process-wide background thread that appends evicted LogStore batches (text and thumbnail PNGs) to disk"""
+    def __init__(self):
+        self.queue = queue.SimpleQueue()
+        self.thread = None
+        self.lock = threading.Lock()
+
+    def submit(self, store, entries):
+        with self.lock:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, daemon=True, name="log-spill")
+                self.thread.start()
+                atexit.register(self.flush)
+        self.queue.put((store, entries))
+
+    def _run(self):
+        while True:
+            store, entries = self.queue.get()
+            if store is None:
+                # flush() marker: everything queued before it has been written
+                entries.set()
+                continue
+            store._write_spill(entries)
+
+    def flush(self, timeout=10):
+        """Wait until every batch submitted so far is on disk"""
+        if self.thread is None:
+            return
+        done = threading.Event()
+        self.queue.put((None, done))
+        done.wait(timeout)
+
+spill_writer = SpillWriter()
+
+class _JsonlFormatter(logging.Formatter):
+    def format(self, record):
+        return json.dumps(record.entry, default=str)
+
+class JsonlLog:
+    """Process-wide structured log: records are queued by the caller and written as JSON lines by a
+    background listener into a size-rotated file, so sessions never touch the disk on the hot path"""
+    def __init__(self, max_bytes=10 * 1024 * 1024, backups=5):
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.logger = logging.getLogger("cisco.phones")
+        self.logger.propagate = False
+        self.logger.setLevel(logging.DEBUG)
+        self.listener = None
+        self.path = None
+        self.lock = threading.Lock()
+
+    def start(self, path):
+        with self.lock:
+            if self.listener is not None:
+                return
+            try:
+                os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+                handler = logging.handlers.RotatingFileHandler(path, maxBytes=self.max_bytes, backupCount=self.backups, encoding="utf-8", delay=True)
+            except OSError:
+                return
+            handler.setFormatter(_JsonlFormatter())
+            log_queue = queue.SimpleQueue()
+            self.logger.addHandler(logging.handlers.QueueHandler(log_queue))
+            self.listener = logging.handlers.QueueListener(log_queue, handler)
+            self.listener.start()
+            self.path = path
+            atexit.register(self.stop)
+
+    def emit(self, level, entry):
+        if self.listener is not None:
+            self.logger.log(level, entry.get("message", ""), extra={"entry": entry})
+
+    def stop(self):
+        with self.lock:
+            if self.listener is None:
+                return
+            self.listener.stop()
+            for handler in list(self.logger.handlers):
+                self.logger.removeHandler(handler)
+            for handler in self.listener.handlers:
+                handler.close()
+            self.listener = None
+
+jsonl_log = JsonlLog()
@@ -0,0 +1,173 @@
+import tkinter as tk
+from tkinter import ttk
+from collections import deque
+from PIL import ImageTk
+
+ALL_CATEGORIES = "(all)"
+
+class LogViewer(tk.Toplevel):
+    """Log window that only renders a slice of the session log.
+
+    Opening shows the newest `page` entries; scrolling to the top loads the previous page.
+    Category filter and search run against LogStore.query instead of the Text widget.
+    """
+    page = 200
+    max_rendered = 1000
+
+    def __init__(self, parent, log_store, title, on_close=None):
+        super().__init__(parent)
+        self.log_store = log_store
+        self.title(title)
+        self.geometry("700x450")
+        self.configure(bg="#121212")
+        if on_close is not None:
+            self.protocol("WM_DELETE_WINDOW", on_close)
+
+        bar = tk.Frame(self, bg="#121212")
+        bar.pack(fill="x", padx=5, pady=4)
+        tk.Label(bar, text="Category", bg="#121212", fg="white").pack(side="left")
+        self.category_var = tk.StringVar(value=ALL_CATEGORIES)
+        self.category_box = ttk.Combobox(bar, textvariable=self.category_var, state="readonly", width=22, postcommand=self._refresh_categories)
+        self.category_box.pack(side="left", padx=5)
+        self.category_box.bind("<<ComboboxSelected>>", lambda e: self.reload())
+        tk.Label(bar, text="Search", bg="#121212", fg="white").pack(side="left", padx=(10, 0))
+        self.search_var = tk.StringVar()
+        search = tk.Entry(bar, textvariable=self.search_var, width=24)
+        search.pack(side="left", padx=5)
+        search.bind("<Return>", lambda e: self.reload())
+        tk.Button(bar, text="Find", command=self.reload).pack(side="left")
+        tk.Button(bar, text="Clear", command=self.clear_filter).pack(side="left", padx=5)
+        self.status = tk.Label(bar, text="", bg="#121212", fg="#7f8c8d")
+        self.status.pack(side="right")
+
+        body = tk.Frame(self)
+        body.pack(fill="both", expand=True)
+        scroll = tk.Scrollbar(body)
+        scroll.pack(side="right", fill="y")
+        self.text = tk.Text(body, bg="#000", fg="#0F0", font=("Consolas", 9), state=tk.DISABLED, wrap="word")
+        self.text.pack(side="left", fill="both", expand=True)
+        self._scrollbar = scroll
+        self.text.config(yscrollcommand=self._on_scroll)
+        scroll.config(command=self.text.yview)
+
+        self.matches = []
+        self.first = 0  # index in self.matches of the oldest rendered entry
+        self.rendered = deque()  # (seq, line count) of rendered entries, oldest first
+        self.photos = {}
+        self.loading = False
+        self.reload()
+
+    def _refresh_categories(self):
+        self.category_box["values"] = [ALL_CATEGORIES] + self.log_store.categories()
+
+    def _filters(self):
+        category = self.category_var.get()
+        return (None if category == ALL_CATEGORIES else category), self.search_var.get().strip() or None
+
+    def clear_filter(self):
+        self.category_var.set(ALL_CATEGORIES)
+        self.search_var.set("")
+        self.reload()
+
+    def reload(self):
+        category, text = self._filters()
+        self.matches = self.log_store.query(category, text)
+        self.first = max(0, len(self.matches) - self.page)
+        self.rendered.clear()
+        self.photos.clear()
+        self.text.config(state=tk.NORMAL)
+        self.text.delete("1.0", tk.END)
+        for entry in self.matches[self.first:]:
+            self._insert(entry, tk.END)
+        self.text.config(state=tk.DISABLED)
+        self.text.see(tk.END)
+        self._update_status()
+
+    def _insert(self, entry, index):
+        if entry["type"] == "image":
+            # Thumbnails become Tk images only while they are on screen
+            photo = ImageTk.PhotoImage(data=entry["content"])
+            self.photos[entry["seq"]] = photo
+            self.text.insert(index, "\n")
+            self.text.image_create(index if index != tk.END else "end-2c", image=photo)
+            lines = 1
+        else:
+            content = entry["content"]
+            self.text.insert(index, content)
+            lines = content.count("\n")
+        record = (entry["seq"], lines)
+        if index == tk.END:
+            self.rendered.append(record)
+        else:
+            self.rendered.appendleft(record)
+        return lines
+
+    def _on_scroll(self, first, last):
+        self._scrollbar.set(first, last)
+        if float(first) <= 0.0 and self.first > 0 and not self.loading:
+            self.loading = True
+            self.after_idle(self._load_older)
+
+    def _load_older(self):
+        self.loading = False
+        if not self.winfo_exists() or self.first == 0:
+            return
+        start = max(0, self.first - self.page)
+        self.text.config(state=tk.NORMAL)
+        added = 0
+        # Prepend newest-first at the top so the page keeps its original order
+        for entry in reversed(self.matches[start:self.first]):
+            added += self._insert(entry, "1.0")
+        self.text.config(state=tk.DISABLED)
+        self.first = start
+        # Keep the line the user was looking at in place
+        self.text.yview(f"{added + 1}.0")
+        self._update_status()
+
+    def append(self, entries):
+        """Live entries from the session; only those matching the current filter are shown"""
+        category, text = self._filters()
+        needle = text.lower() if text else None
+        at_bottom = self.text.yview()[1] >= 0.999
+        shown = False
+        # Entries logged while the window was opening may already be in the initial query
+        last_seq = self.matches[-1]["seq"] if self.matches else -1
+        self.text.config(state=tk.NORMAL)
+        for entry in entries:
+            if entry["seq"] <= last_seq:
+                continue
+            if category and entry.get("category") != category:
+                continue
+            if needle and (entry["type"] != "text" or needle not in entry["content"].lower()):
+                continue
+            self.matches.append(entry)
+            self._insert(entry, tk.END)
+            shown = True
+        if shown:
+            self._trim()
+        self.text.config(state=tk.DISABLED)
+        if shown:
+            if at_bottom:
+                self.text.see(tk.END)
+            self._update_status()
+
+    def _trim(self):
+        # A long-running open window keeps at most max_rendered entries in the widget
+        excess = len(self.rendered) - self.max_rendered
+        if excess <= 0:
+            return
+        lines = 0
+        for _ in range(excess):
+            seq, n = self.rendered.popleft()
+            self.photos.pop(seq, None)
+            lines += n
+        self.text.delete("1.0", f"{lines + 1}.0")
+        self.first += excess
+        # Keep up to max_rendered older matches for scrolling back, drop the rest in step with self.first
+        drop = self.first - self.max_rendered
+        if drop > 0:
+            del self.matches[:drop]
+            self.first -= drop
+
+    def _update_status(self):
+        self.status.config(text=f"{len(self.rendered)} of {len(self.matches)} entries shown")
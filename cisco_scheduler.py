@@ -0,0 +1,204 @@
+import heapq, itertools, threading, time, traceback
+
+class AdaptiveRefresh:
+    """Decides when a phone should be polled next: fast bursts after input or screen changes, exponential back-off while static"""
+    def __init__(self, burst_interval=0.5, idle_interval=5.0, max_interval=30.0, backoff=1.5, burst_polls=4, input_delay=0.4):
+        self.burst_interval = burst_interval
+        self.idle_interval = idle_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.burst_polls = burst_polls
+        self.input_delay = input_delay
+        self.burst_left = 0
+        self.interval = idle_interval
+        self.next_due = time.monotonic()
+
+    def on_input(self):
+        # The phone needs a moment to repaint after a key; then poll quickly for a few frames
+        self.burst_left = self.burst_polls
+        self.interval = self.burst_interval
+        self.next_due = min(self.next_due, time.monotonic() + self.input_delay)
+
+    def on_frame(self, changed):
+        if changed:
+            self.burst_left = self.burst_polls
+            self.interval = self.burst_interval
+        elif self.burst_left > 0:
+            self.burst_left -= 1
+            self.interval = self.burst_interval
+        elif self.interval < self.idle_interval:
+            self.interval = self.idle_interval
+        else:
+            self.interval = min(self.interval * self.backoff, self.max_interval)
+        self.next_due = time.monotonic() + self.interval
+
+    def trigger(self):
+        self.next_due = time.monotonic()
+
+    def due(self):
+        return time.monotonic() >= self.next_due
+
+    def seconds_left(self):
+        return max(0.0, self.next_due - time.monotonic())
+
+class RequestBudget:
+    """Token bucket shared by every session that goes through the same jump host (or direct link)"""
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.capacity = burst if burst is not None else rate
+        self.tokens = self.capacity
+        self.stamp = time.monotonic()
+        self.lock = threading.Lock()
+
+    def try_acquire(self, count=1):
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.stamp) * self.rate)
+            self.stamp = now
+            if self.tokens >= count:
+                self.tokens -= count
+                return True
+            return False
+
+_budgets = {}
+_budgets_lock = threading.Lock()
+
+def request_budget(host_key, rate=20):
+    with _budgets_lock:
+        budget = _budgets.get(host_key)
+        if budget is None:
+            budget = _budgets[host_key] = RequestBudget(rate)
+        return budget
+
+# Request lanes, highest priority first
+KEY_LANE, LINE_INFO_LANE, SCREENSHOT_LANE = 0, 1, 2
+
+class RequestLanes:
+    """Per-phone request queue: at most max_in_flight requests run at once, lowest lane number first.
+
+    Embedded phone web servers handle one request at a time, so queued keys must not wait behind
+    polls. A job submitted with a coalesce key replaces a queued job with the same key, so a poll
+    still waiting when the next one is scheduled is dropped instead of being sent twice.
+    Jobs are coroutine functions; `run` schedules a coroutine and returns a cancellable future.
+    """
+    def __init__(self, run, max_in_flight=1):
+        self.run = run
+        self.max_in_flight = max_in_flight
+        self.queue = []
+        self.queued = {}
+        self.in_flight = 0
+        self.running = set()
+        self.dropped = 0
+        self.counter = itertools.count()
+        self.closed = False
+        self.lock = threading.Lock()
+
+    def submit(self, lane, func, key=None):
+        with self.lock:
+            if self.closed:
+                return False
+            if key is not None and key in self.queued:
+                # Still waiting: the newer request supersedes it
+                self.queued[key][3] = func
+                self.dropped += 1
+                return True
+            job = [lane, next(self.counter), key, func]
+            heapq.heappush(self.queue, job)
+            if key is not None:
+                self.queued[key] = job
+        self._dispatch()
+        return True
+
+    def _dispatch(self):
+        while True:
+            with self.lock:
+                if self.closed or self.in_flight >= self.max_in_flight or not self.queue:
+                    return
+                lane, _, key, func = heapq.heappop(self.queue)
+                if key is not None:
+                    del self.queued[key]
+                self.in_flight += 1
+            future = self.run(self._execute(func))
+            with self.lock:
+                self.running.add(future)
+            future.add_done_callback(self._finished)
+
+    def _finished(self, future):
+        with self.lock:
+            self.running.discard(future)
+
+    async def _execute(self, func):
+        try:
+            await func()
+        except Exception:
+            traceback.print_exc()
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+            self._dispatch()
+
+    def pending(self):
+        with self.lock:
+            return len(self.queue)
+
+    def close(self):
+        """Drop queued jobs and cancel the ones on the wire"""
+        with self.lock:
+            self.closed = True
+            self.queue.clear()
+            self.queued.clear()
+            running = list(self.running)
+        for future in running:
+            future.cancel()
+
+class CircuitBreaker:
+    """Stops polling a phone that keeps failing; after a growing delay a single probe is let through"""
+    def __init__(self, failure_threshold=3, base_delay=10.0, max_delay=300.0):
+        self.failure_threshold = failure_threshold
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.failures = 0
+        self.open_until = 0.0
+        self.probing = False
+        self.lock = threading.Lock()
+
+    @property
+    def is_open(self):
+        return self.failures >= self.failure_threshold
+
+    def allow(self):
+        with self.lock:
+            if not self.is_open:
+                return True
+            if self.probing or time.monotonic() < self.open_until:
+                return False
+            self.probing = True
+            return True
+
+    def release(self):
+        # The probe granted by allow() was not used
+        with self.lock:
+            self.probing = False
+
+    def seconds_left(self):
+        return max(0.0, self.open_until - time.monotonic()) if self.is_open else 0.0
+
+    def record_success(self):
+        """Returns True when this closes an open breaker"""
+        with self.lock:
+            was_open = self.is_open
+            self.failures = 0
+            self.probing = False
+            return was_open
+
+    def record_failure(self):
+        """Returns True when this failure opens the breaker"""
+        with self.lock:
+            was_open = self.is_open
+            self.failures += 1
+            self.probing = False
+            if self.is_open:
+                # Capped exponent: a phone that stays dead for days would otherwise overflow the float
+                delay = self.base_delay * 2 ** min(self.failures - self.failure_threshold, 16)
+                self.open_until = time.monotonic() + min(delay, self.max_delay)
+            return self.is_open and not was_open
@@ -0,0 +1,680 @@
+import os, json, threading, subprocess, sys, asyncio, logging, socket, shlex, time, itertools
+from collections import deque
+from datetime import datetime
+from cisco_transport import create_transport, execute_payload, MAX_EXECUTE_ITEMS, CONNECT_FAILED
+from cisco_sshpool import ssh_pool
+from cisco_logstore import LogStore, jsonl_log, category_level, verbosity_threshold, prune_log_dir
+from cisco_frames import FrameDiff
+from cisco_history import FrameHistory
+from cisco_lineinfo import LineInfoParser, LineStateTracker
+from cisco_events import phone_events, make_event, LINE, VOICEMAIL, REACHABILITY
+from cisco_scheduler import AdaptiveRefresh, RequestLanes, CircuitBreaker, request_budget, KEY_LANE, LINE_INFO_LANE, SCREENSHOT_LANE
+from cisco_engine import phone_engine
+from cisco_config import config_cache
+
+DEFAULT_SSH_CONFIGS = {"default": {"host": "127.0.0.1", "user": "admin", "pass": "password"}}
+DEFAULT_CGI_CONFIGS = {"default": {"user": "admin", "pass": "admin"}}
+
+def resource_path(relative_path):
+    """ Get absolute path to resource, works for dev and for PyInstaller """
+    try:
+        base_path = sys._MEIPASS
+    except Exception:
+        base_path = os.path.abspath(".")
+    return os.path.join(base_path, relative_path)
+
+def get_config_dir():
+    """Consistency helper to find the persistent AppData folder so settings load correctly"""
+    if getattr(sys, 'frozen', False):
+        if os.name == 'nt':
+            base_dir = os.path.join(os.environ.get('APPDATA', ''), 'CGI_Remote_Control')
+        else:
+            base_dir = os.path.join(os.path.expanduser('~'), '.cgi_remote_control')
+    else:
+        # If running as script, check for 'config' folder
+        base_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config')
+
+    if not os.path.exists(base_dir):
+        os.makedirs(base_dir, exist_ok=True)
+    return base_dir
+
+_log_settings = None
+# Spill/history base names of the sessions open in this process, never pruned
+_active_log_bases = set()
+_spill_ids = itertools.count(1)
+_last_prune = 0.0
+_prune_lock = threading.Lock()
+
+def prune_logs(max_bytes, max_age_days, every=3600):
+    """Trim config/logs in the background, at most once per `every` seconds per process"""
+    global _last_prune
+    with _prune_lock:
+        if _last_prune and time.monotonic() - _last_prune < every:
+            return
+        _last_prune = time.monotonic()
+        skip = set(_active_log_bases)
+    threading.Thread(target=prune_log_dir, args=(os.path.join(get_config_dir(), "logs"), max_bytes, max_age_days, skip),
+                     daemon=True, name="log-prune").start()
+
+def load_log_settings():
+    """config/logging.json, read once: {"verbosity": {"*": "info", "line_status_xml": "off"}, "jsonl": true}.
+
+    Without the file every category logs at info and above, so the per-poll debug categories stay out.
+    """
+    global _log_settings
+    if _log_settings is None:
+        settings = {"verbosity": {}, "jsonl": True}
+        try:
+            with open(os.path.join(get_config_dir(), "logging.json"), 'r') as f:
+                settings.update(json.load(f))
+        except (OSError, ValueError):
+            pass
+        _log_settings = settings
+    return _log_settings
+
+def keypad_uris(number, keypad=None):
+    """Map a digit string (0-9, *, #) to keypad URIs, preferring the model's keys_*.json mapping"""
+    keypad = keypad or {}
+    named = {"*": "Key:KeyPadStar", "#": "Key:KeyPadPound"}
+    return [keypad.get(c) or named.get(c) or f"Key:KeyPad{c}" for c in number if c.isdigit() or c in named]
+
+class PhoneSession:
+    """Headless connection to one phone: transport, polling, LineInfo parsing and key execution.
+
+    Views subscribe through the on_* callbacks; on_voicemail and on_line_states ({line index: state})
+    fire only on transitions. on_log is called inline on whichever thread logged, on_frame on the
+    engine's CPU pool (so decoding stays off the UI thread and the loop); the others are delivered
+    through engine.post (the Tk thread when a window has attached the engine, inline otherwise).
+    """
+    log_max_entries = 2000
+    log_max_bytes = 4 * 1024 * 1024
+    host_request_budget = 20  # polls per second shared by all sessions behind one jump host
+    line_info_interval = 5.0  # LineInfo keeps this fixed cadence; only screenshots back off on a static screen
+    request_timeout = 10  # seconds to wait for a response
+    connect_timeout = 5
+    record_history = True  # changed frames go to the on-disk FrameHistory next to the spilled log
+    log_retention_bytes = 512 * 1024 * 1024  # config/logs cap for spilled logs, thumbnails and frame histories
+    log_retention_days = 30
+
+    def __init__(self, phone_ip, device_type, connection_mode, ssh_config_name="default", cgi_config_name="default", transport_mode="native", engine=phone_engine):
+        self.phone_ip = phone_ip
+        self.device_type = device_type
+        self.connection_mode = connection_mode
+        self.ssh_config_name = ssh_config_name
+        self.cgi_config_name = cgi_config_name
+        self.transport_mode = transport_mode
+        self.engine = engine
+        self.transport = None
+        self.ssh = None
+        self.closed = False
+        self.config = {}
+        self.config_file = os.path.join(get_config_dir(), f"keys_{device_type}.json")
+
+        self.on_log = None
+        self.on_frame = None
+        self.on_voicemail = None
+        self.on_line_states = None
+
+        settings = load_log_settings()
+        self.log_verbosity = dict(settings["verbosity"])
+        if settings["jsonl"]:
+            jsonl_log.start(os.path.join(get_config_dir(), "logs", "phones.jsonl"))
+        spill_path = self.log_spill_path()
+        self.log_base = os.path.splitext(os.path.basename(spill_path))[0]
+        _active_log_bases.add(self.log_base)
+        prune_logs(self.log_retention_bytes, self.log_retention_days)
+        self.log_store = LogStore(self.log_max_entries, self.log_max_bytes, spill_path)
+        self.history = FrameHistory(os.path.splitext(spill_path)[0]) if self.record_history else None
+        # Single-flight screenshot state, guarded by refresh_lock
+        self.refresh_lock = threading.Lock()
+        self.is_refreshing = False
+        self.waiting_for_image = False
+        self.refresh_again = False
+        self.fetch_count = 0
+        self.coalesced_refreshes = 0
+        self.scheduler = AdaptiveRefresh()
+        self.request_budget = None
+        self.host_key = None
+        # Keys > LineInfo > screenshot; one request at a time over the single keep-alive connection
+        self.requests = RequestLanes(engine.run_coro, 2 if transport_mode == "curl" else 1)
+        self.breaker = CircuitBreaker()
+        # Running curl processes / SSH exec channels, aborted when the session closes
+        self.running = set()
+        self.running_lock = threading.Lock()
+        self.frame_diff = FrameDiff()
+        self.line_info_lock = threading.Lock()
+        self.line_info_in_flight = False
+        self.line_info_due = 0.0
+        self.line_info_parser = LineInfoParser()
+        self.line_state = LineStateTracker()
+        self.key_queue = deque()
+        self.key_lock = threading.Lock()
+        self.key_sender_active = False
+
+    def _emit(self, callback, *args):
+        if callback is not None and not self.closed:
+            self.engine.post(callback, *args)
+
+    def log_spill_path(self):
+        # pid and a per-process counter keep two sessions for the same phone in the same second apart
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        name = f"{self.phone_ip.replace(':', '_')}_{stamp}_{os.getpid()}-{next(_spill_ids)}.log"
+        return os.path.join(get_config_dir(), "logs", name)
+
+    def log_enabled(self, category):
+        return category_level(category) >= verbosity_threshold(self.log_verbosity, category)
+
+    def add_log(self, category, message, **fields):
+        """Record one structured entry: in-memory store (and view), plus the background JSONL writer"""
+        level = category_level(category)
+        if level < verbosity_threshold(self.log_verbosity, category):
+            return None
+        now = datetime.now()
+        text = f"[{now.strftime('%H:%M:%S.%f')[:-3]}] [{category.upper()}] {message}\n"
+        entry = self.log_store.add_text(text, category=category)
+        jsonl_log.emit(level, {"ts": now.isoformat(timespec="milliseconds"), "ip": self.phone_ip, "category": category,
+                               "level": logging.getLevelName(level).lower(), "message": message, **fields})
+        if self.on_log is not None:
+            self.on_log(entry)
+        return entry
+
+    def load_config(self):
+        self.add_log("config_load", f"Attempting to load config from {self.config_file}")
+        try:
+            if os.path.exists(self.config_file):
+                self.add_log("config_load", f"Config file found at {self.config_file}")
+                self.config = config_cache.load(self.config_file)
+                self.add_log("config_load", f"Config loaded successfully from {self.config_file}")
+            else:
+                self.add_log("config_load", f"Config file not found at {self.config_file}. Checking fallback path.")
+                fallback_path = resource_path(f"config/keys_{self.device_type}.json")
+                if os.path.exists(fallback_path):
+                    self.add_log("config_load", f"Fallback config found at {fallback_path}")
+                    self.config = config_cache.load(fallback_path)
+                    self.add_log("config_load", f"Fallback config loaded successfully from {fallback_path}")
+                else:
+                    self.config = {}
+                    self.add_log("warning", f"No config file found. Loading empty default config.")
+        except json.JSONDecodeError as e:
+            self.config = {}
+            self.add_log("error", f"JSON decoding error in {self.config_file}: {e}. Loading empty default config.")
+        except Exception as e:
+            self.config = {}
+            self.add_log("error", f"Error loading {self.config_file}: {e}. Loading empty default config.")
+        return self.config
+
+    def load_ssh_configs(self):
+        ssh_conf_path = os.path.join(get_config_dir(), "ssh.conf")
+        self.add_log("config_load", f"Attempting to load SSH configs from {ssh_conf_path}")
+        if os.path.exists(ssh_conf_path):
+            self.add_log("config_load", f"SSH config file found at {ssh_conf_path}")
+            try:
+                configs = config_cache.load(ssh_conf_path)
+                self.add_log("config_load", f"SSH configs loaded successfully from {ssh_conf_path}")
+                return configs
+            except json.JSONDecodeError as e:
+                self.add_log("error", f"JSON decoding error in {ssh_conf_path}: {e}. Loading default SSH config.")
+                return dict(DEFAULT_SSH_CONFIGS)
+            except Exception as e:
+                self.add_log("error", f"Error loading SSH configs from {ssh_conf_path}: {e}. Loading default SSH config.")
+                return dict(DEFAULT_SSH_CONFIGS)
+        else:
+            self.add_log("warning", f"SSH config file not found at {ssh_conf_path}. Loading default SSH config.")
+            return dict(DEFAULT_SSH_CONFIGS)
+
+    def load_cgi_configs(self):
+        cgi_conf_path = os.path.join(get_config_dir(), "cgi.conf")
+        self.add_log("config_load", f"Attempting to load CGI configs from {cgi_conf_path}")
+        if os.path.exists(cgi_conf_path):
+            self.add_log("config_load", f"CGI config file found at {cgi_conf_path}")
+            try:
+                configs = config_cache.load(cgi_conf_path)
+                self.add_log("config_load", f"CGI configs loaded successfully from {cgi_conf_path}")
+                return configs
+            except json.JSONDecodeError as e:
+                self.add_log("error", f"JSON decoding error in {cgi_conf_path}: {e}. Loading default CGI config.")
+                return dict(DEFAULT_CGI_CONFIGS)
+            except Exception as e:
+                self.add_log("error", f"Error loading CGI configs from {cgi_conf_path}: {e}. Loading default CGI config.")
+                return dict(DEFAULT_CGI_CONFIGS)
+        else:
+            self.add_log("warning", f"CGI config file not found at {cgi_conf_path}. Loading default CGI config.")
+            return dict(DEFAULT_CGI_CONFIGS)
+
+    def load_credentials(self):
+        self.cgi_configs = self.load_cgi_configs()
+        cgi_config = self.cgi_configs.get(self.cgi_config_name, self.cgi_configs.get("default"))
+        self.CGI_USER = cgi_config["user"]
+        self.CGI_PASS = cgi_config["pass"]
+
+    def connect(self):
+        """Open the SSH bridge (if any) and the transport; SSH errors propagate to the caller"""
+        self.load_credentials()
+        if self.connection_mode == "local":
+            self.add_log("system", "Using local/direct connection mode")
+        else:
+            self.ssh_configs = self.load_ssh_configs()
+            config = self.ssh_configs.get(self.ssh_config_name, self.ssh_configs.get("default"))
+            self.SSH_HOST = config["host"]
+            self.SSH_USER = config["user"]
+            self.SSH_PASS = config["pass"]
+            self.add_log("system", f"Connecting to SSH Host: {self.SSH_HOST} (Profile: {self.ssh_config_name})...")
+            # Sessions on the same profile share one jump host connection
+            self.ssh = ssh_pool.acquire(self.ssh_config_name, config)
+            self.add_log("system", "SSH Connection Established")
+        self.setup_transport()
+        if self.closed:
+            # The view was closed while connecting; hand back the pooled SSH connection
+            self.close()
+
+    def setup_transport(self):
+        # In SSH bridge mode the native transport tunnels HTTP through the jump host (direct-tcpip)
+        ssh_client = self.ssh if self.connection_mode != "local" else None
+        # Local curl runs as an asyncio subprocess on the engine loop; over SSH it is a blocking exec
+        async_runner = self.aexec_cmd if self.connection_mode == "local" else None
+        self.transport = create_transport(self.transport_mode, self.phone_ip, self.CGI_USER, self.CGI_PASS, self.exec_cmd, ssh_client, self.request_timeout, self.connect_timeout, async_runner)
+        self.add_log("system", f"Using {self.transport.name} transport")
+        self.host_key = self.SSH_HOST if self.connection_mode != "local" else "local"
+        self.request_budget = request_budget(self.host_key, self.host_request_budget)
+
+    def _track(self, handle, running):
+        with self.running_lock:
+            if running:
+                if self.closed:
+                    return False
+                self.running.add(handle)
+            else:
+                self.running.discard(handle)
+        return True
+
+    def exec_cmd(self, cmd):
+        # curl has its own --max-time; this is the backstop if the runner itself hangs
+        limit = self.request_timeout + self.connect_timeout + 5
+        if self.connection_mode == "local":
+            try:
+                # Binary mode: screenshots are PNG/BMP bytes and must not round-trip through str.
+                # No shell, so killing the process on close/timeout really stops curl
+                proc = subprocess.Popen(shlex.split(cmd), stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            except Exception as e:
+                return b"", str(e).encode()
+            if not self._track(proc, True):
+                proc.kill()
+                return b"", b"Session closed"
+            try:
+                return proc.communicate(timeout=limit)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                proc.communicate()
+                return b"", b"Command timed out"
+            finally:
+                self._track(proc, False)
+        else:
+            try:
+                stdin, stdout, stderr = self.ssh.exec_command(cmd, timeout=limit)
+            except Exception as e:
+                # The jump host refused the exec, so curl never ran
+                return b"", f"{CONNECT_FAILED}: {e}".encode()
+            channel = stdout.channel
+            if not self._track(channel, True):
+                channel.close()
+                return b"", b"Session closed"
+            try:
+                return stdout.read(), stderr.read()
+            except socket.timeout:
+                return b"", b"Command timed out"
+            finally:
+                channel.close()
+                self._track(channel, False)
+
+    async def aexec_cmd(self, cmd):
+        """exec_cmd for the engine loop: local curl as an asyncio subprocess, killed if the request is cancelled"""
+        limit = self.request_timeout + self.connect_timeout + 5
+        try:
+            proc = await asyncio.create_subprocess_exec(*shlex.split(cmd), stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        except Exception as e:
+            return b"", str(e).encode()
+        try:
+            return await asyncio.wait_for(proc.communicate(), limit)
+        except asyncio.TimeoutError:
+            return b"", b"Command timed out"
+        finally:
+            if proc.returncode is None:
+                proc.kill()
+
+    async def _get(self, path, key=False):
+        if self.transport.blocking:
+            return await self.engine.blocking(self.host_key, self.transport.get, path, key=key)
+        return await self.transport.aget(path)
+
+    async def _post_xml(self, path, xml, key=False):
+        if self.transport.blocking:
+            return await self.engine.blocking(self.host_key, self.transport.post_xml, path, xml, key=key)
+        return await self.transport.apost_xml(path, xml)
+
+    def _record_reachability(self, ok):
+        if ok:
+            if self.breaker.record_success():
+                self.add_log("system", "Phone is answering again; polling resumed")
+                phone_events.publish(make_event(REACHABILITY, self.phone_ip, None, False, True))
+        elif self.breaker.record_failure():
+            self.add_log("warning", f"Phone unreachable after {self.breaker.failures} attempts; polling paused, probing every {self.breaker.seconds_left():.0f}s or more")
+            phone_events.publish(make_event(REACHABILITY, self.phone_ip, None, True, False))
+
+    def poll_if_due(self):
+        """Start whichever polls are due: screenshots on the adaptive schedule, LineInfo every line_info_interval"""
+        if self.closed or self.transport is None:
+            return False
+        screen_due = not self.waiting_for_image and self.scheduler.due()
+        line_info_due = time.monotonic() >= self.line_info_due
+        if not (screen_due or line_info_due):
+            return False
+        # Dead phones are only probed now and then, so they cannot tie up workers and channels
+        if not self.breaker.allow():
+            return False
+        if self.breaker.is_open:
+            # The probe is a single LineInfo request, so one probe records at most one failure
+            started = self.request_budget.try_acquire() and self.check_line_info()
+            if not started:
+                self.breaker.release()
+            return started
+        # Every session behind the same jump host draws from one budget
+        started = False
+        if line_info_due and self.request_budget.try_acquire():
+            self.check_line_info()
+            started = True
+        if screen_due and self.request_budget.try_acquire():
+            self.refresh()
+            started = True
+        if not started:
+            self.breaker.release()
+        return started
+
+    def refresh(self, fresh=False):
+        """Fetch a screenshot unless one is already in flight, in which case this call joins it.
+
+        fresh=True means the in-flight frame may predate whatever the caller just did, so one more
+        fetch is made right after it completes.
+        """
+        with self.refresh_lock:
+            if self.closed or self.transport is None:
+                return
+            if self.is_refreshing:
+                self.coalesced_refreshes += 1
+                self.refresh_again = self.refresh_again or fresh
+                return
+            self.is_refreshing = True
+            self.waiting_for_image = True
+        self.requests.submit(SCREENSHOT_LANE, self._fetch_image, key="screenshot")
+        if fresh:
+            # Refresh Now / window start: bring the line keys up to date as well
+            self.check_line_info()
+
+    async def _fetch_image(self):
+        self.fetch_count += 1
+        changed = False
+        try:
+            img_data, err_data = await self._get("/CGI/Screenshot")
+            self._record_reachability(bool(img_data))
+            if img_data and len(img_data) > 500:
+                # Idle phones return the same frame most of the time; skip decode, thumbnail and redraw
+                if self.frame_diff.payload_changed(img_data):
+                    self.frame_diff.mark_changed()
+                    changed = True
+                    await self.engine.offload(self._store_frame, img_data, self.frame_diff.last_payload)
+            else:
+                err_msg = err_data.decode().strip() if err_data else "No data received"
+                self.add_log("error", f"Screenshot failed. {err_msg}")
+        except Exception as e:
+            self._record_reachability(False)
+            self.add_log("error", f"Screenshot error: {e}")
+        finally:
+            with self.refresh_lock:
+                again = self.refresh_again and not self.closed
+                self.refresh_again = False
+                self.is_refreshing = again
+                self.waiting_for_image = again
+            self.engine.post(self.scheduler.on_frame, changed)
+            if again:
+                self.requests.submit(SCREENSHOT_LANE, self._fetch_image, key="screenshot")
+
+    def _store_frame(self, img_data, digest):
+        if self.history is not None:
+            self.history.append(img_data, digest=digest)
+        if self.on_frame is not None:
+            self.on_frame(img_data)
+
+    def check_line_info(self):
+        # One LineInfo fetch feeds both the voicemail lamp and the line keys; overlapping triggers share it
+        with self.line_info_lock:
+            if self.line_info_in_flight or self.closed or self.transport is None:
+                return False
+            self.line_info_in_flight = True
+            self.line_info_due = time.monotonic() + self.line_info_interval
+        self.requests.submit(LINE_INFO_LANE, self._check_line_info, key="line_info")
+        return True
+
+    async def _check_line_info(self):
+        self.add_log("line_status_request", self.transport.describe_get("/CGI/LineInfo"))
+        try:
+            data, err = await self._get("/CGI/LineInfo")
+            self._record_reachability(bool(data))
+            if data:
+                # Log the raw XML response for debugging
+                if self.log_enabled("line_status_xml"):
+                    self.add_log("line_status_xml", f"Raw XML response:\n{data[:500].decode(errors='replace')}...")
+
+                has_voicemail, line_icon_states = self.line_info_parser.parse(data)
+                if not line_icon_states:
+                    self.add_log("warning", "No line icon states found in XML response")
+                # Most polls change nothing; only transitions reach the view and the log
+                old_voicemail = self.line_state.voicemail
+                voicemail_changed, changes = self.line_state.update(has_voicemail, line_icon_states)
+                if voicemail_changed:
+                    self._emit(self.on_voicemail, has_voicemail)
+                    phone_events.publish(make_event(VOICEMAIL, self.phone_ip, None, old_voicemail, has_voicemail))
+                if changes:
+                    changed = {i: new for i, (old, new) in changes.items()}
+                    self.add_log("line_status_response", f"Line states ({self.line_info_parser.schema}): {line_icon_states}", states=line_icon_states, changed=changed)
+                    self._emit(self.on_line_states, changed)
+                    for i, (old, new) in changes.items():
+                        phone_events.publish(make_event(LINE, self.phone_ip, i, old, new))
+            else:
+                self.add_log("error", "Failed to fetch LineInfo")
+        except Exception as e:
+            self._record_reachability(False)
+            self.add_log("error", f"LineInfo check error: {e}")
+        finally:
+            with self.line_info_lock:
+                self.line_info_in_flight = False
+
+    def replay_line_state(self):
+        """Send the last known lamp and line states to the view again, e.g. after it rebuilt its widgets"""
+        if self.line_state.voicemail is not None:
+            self._emit(self.on_voicemail, self.line_state.voicemail)
+        if self.line_state.lines:
+            self._emit(self.on_line_states, dict(enumerate(self.line_state.lines)))
+
+    def press(self, uri):
+        if not uri:
+            return
+        self.press_sequence([uri])
+
+    def press_sequence(self, uris):
+        """Queue keys/URIs for this phone; they are sent in order, packed into as few Execute requests as possible"""
+        uris = [u for u in uris if u]
+        if not uris or self.closed:
+            return
+        if self.transport is None:
+            self.add_log("warning", "Not connected yet; keys ignored")
+            return
+        with self.key_lock:
+            self.key_queue.extend(uris)
+            if self.key_sender_active:
+                # The running sender picks these up, so keys clicked while a request is in flight get pipelined
+                return
+            self.key_sender_active = True
+        self.requests.submit(KEY_LANE, self._send_keys)
+
+    def dial(self, number):
+        uris = keypad_uris(number, self.config.get('keypad'))
+        self.add_log("macro", f"Dialing {number} ({len(uris)} keys)")
+        self.press_sequence(uris)
+
+    def post_execute(self, batch):
+        """Send one CiscoIPPhoneExecute for up to MAX_EXECUTE_ITEMS URIs; returns (response, error) text"""
+        payload = self._execute_request(batch)
+        return self._execute_result(*self.transport.post_xml("/CGI/Execute", payload))
+
+    async def _apost_execute(self, batch):
+        payload = self._execute_request(batch)
+        return self._execute_result(*await self._post_xml("/CGI/Execute", payload, key=True))
+
+    def _execute_request(self, batch):
+        payload = execute_payload(*batch)
+        self.add_log("key_send", self.transport.describe_post("/CGI/Execute", payload), uris=list(batch))
+        return payload
+
+    def _execute_result(self, resp_data, err_data):
+        resp = resp_data.decode(errors="replace").strip() if resp_data else ""
+        err = err_data.decode(errors="replace").strip() if err_data else ""
+        if resp:
+            self.add_log("cgi_resp", resp)
+        if err:
+            self.add_log("error", err)
+        return resp, err
+
+    def execute_sequence(self, uris):
+        """Blocking variant of press_sequence for scripts and bulk runs; returns one (response, error) per request"""
+        uris = [u for u in uris if u]
+        results = []
+        for i in range(0, len(uris), MAX_EXECUTE_ITEMS):
+            results.append(self.post_execute(uris[i:i + MAX_EXECUTE_ITEMS]))
+        return results
+
+    async def _send_keys(self):
+        # One sender per phone keeps keys ordered; the screen is refreshed once after the queue drains
+        while True:
+            with self.key_lock:
+                if not self.key_queue:
+                    self.key_sender_active = False
+                    break
+                batch = [self.key_queue.popleft() for _ in range(min(MAX_EXECUTE_ITEMS, len(self.key_queue)))]
+            try:
+                await self._apost_execute(batch)
+            except Exception as e:
+                self.add_log("error", f"Key send error: {e}")
+        # A frame already being fetched predates these keys; fetch once more when it lands
+        with self.refresh_lock:
+            if self.is_refreshing:
+                self.refresh_again = True
+        # Switches the scheduler into burst mode; the first poll follows shortly after the last key.
+        # Keys often change line state (answer, hold), so LineInfo is brought forward too
+        self.line_info_due = min(self.line_info_due, time.monotonic() + self.scheduler.input_delay)
+        self.engine.post(self.scheduler.on_input)
+
+    def close(self):
+        # Idempotent, so connect() can call it again for anything it acquired after an early close
+        self.closed = True
+        self.requests.close()
+        # Abort whatever is still on the wire instead of letting it run into its timeout
+        with self.running_lock:
+            running = list(self.running)
+            self.running.clear()
+        for handle in running:
+            try:
+                if isinstance(handle, subprocess.Popen):
+                    handle.kill()
+                else:
+                    handle.close()
+            except Exception:
+                pass
+        if self.transport:
+            self.transport.close()
+        if self.history is not None:
+            self.history.close()
+        _active_log_bases.discard(self.log_base)
+        if self.ssh:
+            try:
+                self.ssh.close()
+            except Exception:
+                pass
+
+class PhoneFleet:
+    """Set of headless sessions polled together from the engine loop, without any GUI"""
+    def __init__(self, engine=phone_engine, tick=0.25):
+        self.engine = engine
+        self.tick = tick
+        self.sessions = []
+        self.lock = threading.Lock()
+        self.polling = None
+
+    def open(self, phone_ip, device_type, connection_mode, ssh_config_name="default", cgi_config_name="default", transport_mode="native"):
+        session = PhoneSession(phone_ip, device_type, connection_mode, ssh_config_name, cgi_config_name, transport_mode, engine=self.engine)
+        session.load_config()
+        session.connect()
+        self.add(session)
+        return session
+
+    def open_many(self, specs):
+        """Open several sessions at once; specs are open() argument tuples.
+
+        Connections are made in parallel on the engine's startup pool, so the whole batch costs
+        about one connect time. Returns (sessions, [(spec, error), ...]).
+        """
+        futures = [(spec, self.engine.run_connect(self._open_one, spec)) for spec in specs]
+        sessions, failures = [], []
+        for spec, future in futures:
+            try:
+                session = future.result()
+            except Exception as e:
+                failures.append((spec, e))
+                continue
+            self.add(session)
+            sessions.append(session)
+        return sessions, failures
+
+    def _open_one(self, spec):
+        session = PhoneSession(*spec, engine=self.engine)
+        session.load_config()
+        try:
+            session.connect()
+        except Exception:
+            session.close()
+            raise
+        return session
+
+    def add(self, session):
+        with self.lock:
+            self.sessions.append(session)
+
+    def remove(self, session):
+        with self.lock:
+            if session in self.sessions:
+                self.sessions.remove(session)
+        session.close()
+
+    def start_polling(self):
+        if self.polling is None:
+            self.polling = self.engine.run_coro(self._poll_loop())
+        return self.polling
+
+    def stop_polling(self):
+        if self.polling is not None:
+            self.polling.cancel()
+            self.polling = None
+
+    async def _poll_loop(self):
+        while True:
+            with self.lock:
+                sessions = list(self.sessions)
+            for session in sessions:
+                session.poll_if_due()
+            await asyncio.sleep(self.tick)
+
+    def close_all(self):
+        self.stop_polling()
+        with self.lock:
+            sessions = list(self.sessions)
+            self.sessions.clear()
+        for session in sessions:
+            session.close()
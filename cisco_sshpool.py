@@ -0,0 +1,125 @@
+import socket, threading, paramiko
+
+class _PoolEntry:
+    def __init__(self, config):
+        self.config = config
+        self.client = None
+        self.client_config = None
+        self.refs = 0
+        self.released = False
+        self.lock = threading.Lock()
+
+class PooledSSHClient:
+    """Per-session handle on a shared jump host connection; quacks like paramiko.SSHClient"""
+    def __init__(self, pool, profile_name):
+        self.pool = pool
+        self.profile_name = profile_name
+        self.closed = False
+
+    def get_transport(self):
+        return self.pool.get_client(self.profile_name).get_transport()
+
+    def exec_command(self, cmd, timeout=None):
+        return self.pool.get_client(self.profile_name).exec_command(cmd, timeout=timeout)
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.pool.release(self.profile_name)
+
+class SSHPool:
+    """Process-wide jump host connections keyed by ssh.conf profile name, reference counted per session"""
+    def __init__(self, keepalive=30, timeout=10):
+        self.keepalive = keepalive
+        self.timeout = timeout
+        self.entries = {}
+        self.lock = threading.Lock()
+
+    def acquire(self, profile_name, config):
+        with self.lock:
+            entry = self.entries.get(profile_name)
+            if entry is None:
+                entry = self.entries[profile_name] = _PoolEntry(config)
+            else:
+                # A profile edited in ssh.conf makes the next get_client reconnect with the new settings
+                entry.config = config
+            entry.refs += 1
+        try:
+            self.get_client(profile_name)
+        except Exception:
+            self.release(profile_name)
+            raise
+        return PooledSSHClient(self, profile_name)
+
+    def get_client(self, profile_name):
+        with self.lock:
+            entry = self.entries.get(profile_name)
+        if entry is None:
+            raise paramiko.SSHException(f"SSH profile '{profile_name}' is not connected")
+        with entry.lock:
+            if entry.released:
+                raise paramiko.SSHException(f"SSH profile '{profile_name}' is not connected")
+            transport = entry.client.get_transport() if entry.client else None
+            if transport is None or not transport.is_active() or entry.client_config != entry.config:
+                self._close_client(entry)
+                config = entry.config
+                entry.client = self._connect(config)
+                entry.client_config = config
+            return entry.client
+
+    def _connect(self, config):
+        client = paramiko.SSHClient()
+        client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        # Use banner_timeout and auth_timeout to prevent hanging
+        client.connect(
+            config["host"],
+            username=config["user"],
+            password=config["pass"],
+            timeout=self.timeout,
+            banner_timeout=self.timeout,
+            auth_timeout=self.timeout,
+            look_for_keys=False,
+            allow_agent=False
+        )
+        transport = client.get_transport()
+        transport.set_keepalive(self.keepalive)
+        # Tunnelled requests are small writes waiting on a reply; Nagle would hold them for the peer's delayed ACK (~40 ms)
+        transport.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return client
+
+    def _close_client(self, entry):
+        if entry.client is not None:
+            try:
+                entry.client.close()
+            except Exception:
+                pass
+            entry.client = None
+
+    def release(self, profile_name):
+        with self.lock:
+            entry = self.entries.get(profile_name)
+            if entry is None:
+                return
+            entry.refs -= 1
+            if entry.refs > 0:
+                return
+            del self.entries[profile_name]
+            entry.released = True
+        # Closing the last window runs this on the Tk thread, and entry.lock may be held for a whole
+        # reconnect (connect, banner and auth timeouts); the client is closed once that is over
+        threading.Thread(target=self._close_released, args=(entry,), daemon=True, name="ssh-close").start()
+
+    def _close_released(self, entry):
+        with entry.lock:
+            self._close_client(entry)
+
+    def close_all(self):
+        with self.lock:
+            entries = list(self.entries.values())
+            self.entries.clear()
+        for entry in entries:
+            entry.released = True
+            with entry.lock:
+                self._close_client(entry)
+
+ssh_pool = SSHPool()
@@ -0,0 +1,359 @@
+import asyncio, base64, http.client, socket, threading, time, urllib.parse
+
+TRANSPORT_MODES = ["native", "curl"]
+
+# Phones accept at most three ExecuteItems in one CiscoIPPhoneExecute request
+MAX_EXECUTE_ITEMS = 3
+
+# Error text prefix for requests that failed before anything was sent (jump host or phone unreachable)
+CONNECT_FAILED = "Connect failed"
+# curl -S messages for the same situation: resolve/connect errors and connect-phase timeouts
+_CURL_NOT_SENT = ("curl: (6)", "curl: (7)", "Connection timed out after", "Failed to connect")
+
+def request_not_sent(err):
+    """True when an error shows the request never reached the phone, so sending it again cannot repeat it"""
+    text = err.decode(errors="replace") if isinstance(err, bytes) else (err or "")
+    return text.startswith(CONNECT_FAILED) or any(marker in text for marker in _CURL_NOT_SENT)
+
+def execute_payload(*uris):
+    """Build the CiscoIPPhoneExecute document for up to MAX_EXECUTE_ITEMS keys/URIs, executed in order"""
+    items = "".join(f"<ExecuteItem URL='{uri}'/>" for uri in uris)
+    return f"<CiscoIPPhoneExecute>{items}</CiscoIPPhoneExecute>"
+
+class CurlTransport:
+    """Runs curl through the supplied command runner (local process or SSH exec).
+
+    With an async_runner (local curl as an asyncio subprocess) the engine awaits aget/apost_xml on
+    its loop; without one the calls are blocking and go to the engine's worker pool.
+    """
+    name = "curl"
+
+    def __init__(self, phone_ip, user, password, runner, timeout=10, connect_timeout=5, async_runner=None):
+        self.phone_ip = phone_ip
+        self.user = user
+        self.password = password
+        self.runner = runner
+        self.async_runner = async_runner
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+
+    @property
+    def blocking(self):
+        return self.async_runner is None
+
+    def _limits(self):
+        # curl gives up on its own, so an unreachable phone never pins the runner
+        # -S keeps curl's error message on stderr so request_not_sent() can tell connect failures apart
+        return f"-S --connect-timeout {self.connect_timeout:g} --max-time {self.timeout:g}"
+
+    def build_get(self, path):
+        return f"curl -s {self._limits()} -u {self.user}:{self.password} http://{self.phone_ip}{path}"
+
+    def build_post(self, path, xml):
+        return f"curl -s {self._limits()} -u {self.user}:{self.password} --data-urlencode \"XML={xml}\" http://{self.phone_ip}{path}"
+
+    def describe_get(self, path):
+        return f"CURL: {self.build_get(path)}"
+
+    def describe_post(self, path, xml):
+        return f"CURL: {self.build_post(path, xml)}"
+
+    def get(self, path):
+        return self.runner(self.build_get(path))
+
+    def post_xml(self, path, xml):
+        return self.runner(self.build_post(path, xml))
+
+    async def aget(self, path):
+        return await self.async_runner(self.build_get(path))
+
+    async def apost_xml(self, path, xml):
+        return await self.async_runner(self.build_post(path, xml))
+
+    def close(self):
+        pass
+
+class HttpTransport:
+    """In-process HTTP/1.1 client that keeps one connection per phone alive between requests.
+
+    get/post_xml block the calling thread (scripts, bulk runs); aget/apost_xml are the same requests
+    as non-blocking asyncio streams for the engine loop, so a phone that never answers costs a
+    socket rather than a worker thread.
+    """
+    name = "native"
+    blocking = False
+    # Phones drop idle keep-alive connections; a POST is never retried, so it gets a fresh one instead
+    post_reuse_idle = 2.0
+
+    def __init__(self, phone_ip, user, password, port=80, timeout=10, connect_timeout=5):
+        self.phone_ip = phone_ip
+        self.port = port
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        token = base64.b64encode(f"{user}:{password}".encode()).decode()
+        self.headers = {"Authorization": f"Basic {token}", "Connection": "keep-alive"}
+        self.conn = None
+        self.conn_used = 0.0
+        self.closed = False
+        self.lock = threading.Lock()
+        # Async connection state, only touched on the engine loop
+        self.stream = None
+        self.stream_used = 0.0
+        self.stream_lock = None
+        self.loop = None
+        self.request_task = None
+
+    def describe_get(self, path):
+        return f"HTTP GET http://{self.phone_ip}{path}"
+
+    def describe_post(self, path, xml):
+        return f"HTTP POST http://{self.phone_ip}{path} XML={xml}"
+
+    def _connect(self):
+        return http.client.HTTPConnection(self.phone_ip, self.port, timeout=self.connect_timeout)
+
+    def _request(self, method, path, body=None, headers=None):
+        hdrs = dict(self.headers)
+        if headers:
+            hdrs.update(headers)
+        with self.lock:
+            try:
+                # A reused keep-alive socket may have been closed by the phone. Only a GET is retried on a
+                # fresh one: a POST that failed after sending may already have been executed by the phone
+                for attempt in range(2):
+                    if self.closed:
+                        return b"", b"Transport closed"
+                    if method != "GET" and self.conn is not None and time.monotonic() - self.conn_used > self.post_reuse_idle:
+                        self._drop()
+                    reused = self.conn is not None
+                    if self.conn is None:
+                        self.conn = self._connect()
+                    if self.conn.sock is None:
+                        try:
+                            # Short timeout to establish the connection, the longer one for each response
+                            self.conn.connect()
+                            self.conn.sock.settimeout(self.timeout)
+                            if self.closed:
+                                return b"", b"Transport closed"
+                        except Exception as e:
+                            # Unreachable phone or SSH channel-open failure: nothing was sent
+                            self._drop()
+                            return b"", f"{CONNECT_FAILED}: {e}".encode()
+                    try:
+                        self.conn.request(method, path, body=body, headers=hdrs)
+                        resp = self.conn.getresponse()
+                        data = resp.read()
+                        self.conn_used = time.monotonic()
+                        if resp.will_close:
+                            self._drop()
+                        if resp.status >= 400:
+                            return data, f"HTTP {resp.status} {resp.reason}".encode()
+                        return data, b""
+                    except (http.client.HTTPException, ConnectionError, BrokenPipeError) as e:
+                        self._drop()
+                        if reused and attempt == 0 and method == "GET":
+                            continue
+                        return b"", str(e).encode()
+                    except Exception as e:
+                        # Timeouts
+                        self._drop()
+                        return b"", str(e).encode()
+                return b"", b"Request failed"
+            finally:
+                # close() never waits for this lock; the request in flight drops the connection itself
+                if self.closed:
+                    self._drop()
+
+    def _drop(self):
+        if self.conn is not None:
+            try:
+                self.conn.close()
+            except Exception:
+                pass
+        self.conn = None
+
+    def get(self, path):
+        return self._request("GET", path)
+
+    def post_xml(self, path, xml):
+        # Same body curl produces for --data-urlencode "XML=..."
+        body = "XML=" + urllib.parse.quote(xml, safe="")
+        return self._request("POST", path, body=body, headers={"Content-Type": "application/x-www-form-urlencoded"})
+
+    async def aget(self, path):
+        return await self._arequest("GET", path)
+
+    async def apost_xml(self, path, xml):
+        body = "XML=" + urllib.parse.quote(xml, safe="")
+        return await self._arequest("POST", path, body=body.encode(), headers={"Content-Type": "application/x-www-form-urlencoded"})
+
+    async def _open_stream(self):
+        return await asyncio.open_connection(self.phone_ip, self.port)
+
+    async def _arequest(self, method, path, body=None, headers=None):
+        self.loop = asyncio.get_running_loop()
+        if self.stream_lock is None:
+            self.stream_lock = asyncio.Lock()
+        async with self.stream_lock:
+            self.request_task = asyncio.current_task()
+            try:
+                # Same retry rule as the blocking path: only a GET is repeated on a fresh connection
+                for attempt in range(2):
+                    if self.closed:
+                        return b"", b"Transport closed"
+                    if method != "GET" and self.stream is not None and time.monotonic() - self.stream_used > self.post_reuse_idle:
+                        self._adrop()
+                    reused = self.stream is not None
+                    if self.stream is None:
+                        try:
+                            self.stream = await asyncio.wait_for(self._open_stream(), self.connect_timeout)
+                        except asyncio.TimeoutError:
+                            return b"", f"{CONNECT_FAILED}: timed out".encode()
+                        except Exception as e:
+                            return b"", f"{CONNECT_FAILED}: {e}".encode()
+                    try:
+                        status, reason, data = await asyncio.wait_for(self._exchange(method, path, body, headers), self.timeout)
+                        self.stream_used = time.monotonic()
+                    except (ConnectionError, asyncio.IncompleteReadError) as e:
+                        self._adrop()
+                        if reused and attempt == 0 and method == "GET":
+                            continue
+                        return b"", (str(e) or "Connection lost").encode()
+                    except asyncio.TimeoutError:
+                        self._adrop()
+                        return b"", b"Request timed out"
+                    except Exception as e:
+                        self._adrop()
+                        return b"", str(e).encode()
+                    if status >= 400:
+                        return data, f"HTTP {status} {reason}".encode()
+                    return data, b""
+                return b"", b"Request failed"
+            except asyncio.CancelledError:
+                # close() cancels whatever is on the wire, including a connect still in progress
+                self._adrop()
+                raise
+            finally:
+                self.request_task = None
+
+    async def _exchange(self, method, path, body, headers):
+        reader, writer = self.stream
+        hdrs = {"Host": self.phone_ip if self.port == 80 else f"{self.phone_ip}:{self.port}", **self.headers, **(headers or {})}
+        if body is not None:
+            hdrs["Content-Length"] = str(len(body))
+        head = f"{method} {path} HTTP/1.1\r\n" + "".join(f"{k}: {v}\r\n" for k, v in hdrs.items()) + "\r\n"
+        # One write for head and body, like http.client, so Nagle never splits the request
+        writer.write(head.encode("latin-1") + (body or b""))
+        await writer.drain()
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionResetError("Connection closed by phone")
+        version, _, rest = status_line.decode("latin-1").strip().partition(" ")
+        code, _, reason = rest.partition(" ")
+        status = int(code)
+        resp_headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            resp_headers[name.strip().lower()] = value.strip()
+        connection = resp_headers.get("connection", "").lower()
+        will_close = connection == "close" or (version == "HTTP/1.0" and connection != "keep-alive")
+        if resp_headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int((await reader.readline()).split(b";")[0].strip() or b"0", 16)
+                if size == 0:
+                    # Trailers, up to the blank line
+                    while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                        pass
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readline()
+            data = b"".join(chunks)
+        elif "content-length" in resp_headers:
+            data = await reader.readexactly(int(resp_headers["content-length"]))
+        elif status in (204, 304):
+            data = b""
+        else:
+            data = await reader.read()
+            will_close = True
+        if will_close:
+            self._adrop()
+        return status, reason, data
+
+    def _adrop(self):
+        if self.stream is not None:
+            self.stream[1].close()
+        self.stream = None
+
+    def close(self):
+        # Never waits for the lock (close runs on the Tk thread): shutting the socket down makes a request
+        # in flight fail fast, and whichever thread holds the lock drops the connection on its way out.
+        # A connect in progress cannot be interrupted; it gives up within connect_timeout and sees closed
+        self.closed = True
+        conn = self.conn
+        sock = conn.sock if conn is not None else None
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except Exception:
+                pass
+        if self.lock.acquire(blocking=False):
+            try:
+                self._drop()
+            finally:
+                self.lock.release()
+        if self.loop is not None and not self.loop.is_closed():
+            # The async stream belongs to the engine loop: cancel the request on the wire, then drop the stream
+            task = self.request_task
+            if task is not None:
+                self.loop.call_soon_threadsafe(task.cancel)
+            self.loop.call_soon_threadsafe(self._adrop)
+
+class _ChannelHTTPConnection(http.client.HTTPConnection):
+    """HTTPConnection whose socket is a paramiko direct-tcpip channel through the jump host"""
+    def __init__(self, ssh_client, host, port, timeout):
+        super().__init__(host, port, timeout=timeout)
+        self.ssh_client = ssh_client
+
+    def connect(self):
+        transport = self.ssh_client.get_transport()
+        if transport is None or not transport.is_active():
+            raise ConnectionError("SSH transport is not active")
+        chan = transport.open_channel("direct-tcpip", (self.host, self.port), ("127.0.0.1", 0), timeout=self.timeout)
+        chan.settimeout(self.timeout)
+        self.sock = chan
+
+class SSHTunnelTransport(HttpTransport):
+    """HTTP over a tunnelled channel to the phone, reused across requests instead of exec'ing curl each time.
+
+    paramiko channels only offer blocking reads, so this transport has no async path: the engine runs
+    get/post_xml on its worker pool, capped per jump host.
+    """
+    name = "ssh-tunnel"
+    blocking = True
+    # No async path: PhoneSession checks `blocking` and never awaits these on a tunnel
+    aget = None
+    apost_xml = None
+
+    def __init__(self, phone_ip, user, password, ssh_client, port=80, timeout=10, connect_timeout=5):
+        super().__init__(phone_ip, user, password, port=port, timeout=timeout, connect_timeout=connect_timeout)
+        self.ssh_client = ssh_client
+
+    def describe_get(self, path):
+        return f"TUNNEL GET http://{self.phone_ip}{path}"
+
+    def describe_post(self, path, xml):
+        return f"TUNNEL POST http://{self.phone_ip}{path} XML={xml}"
+
+    def _connect(self):
+        return _ChannelHTTPConnection(self.ssh_client, self.phone_ip, self.port, self.connect_timeout)
+
+def create_transport(mode, phone_ip, user, password, runner, ssh_client=None, timeout=10, connect_timeout=5, async_runner=None):
+    if mode == "native":
+        if ssh_client is not None:
+            return SSHTunnelTransport(phone_ip, user, password, ssh_client, timeout=timeout, connect_timeout=connect_timeout)
+        return HttpTransport(phone_ip, user, password, timeout=timeout, connect_timeout=connect_timeout)
+    return CurlTransport(phone_ip, user, password, runner, timeout=timeout, connect_timeout=connect_timeout, async_runner=async_runner)
@@ -1,9 +1,15 @@
 from tkinter import simpledialog, messagebox, ttk, Tk
 import tkinter as tk
-import os, json, sys
+import os, json, sys, copy, threading
 from dotenv import load_dotenv
 from PIL import Image, ImageTk
 from cisco_core import resource_path
+from cisco_transport import TRANSPORT_MODES
+from cisco_sshpool import ssh_pool
+from cisco_engine import phone_engine
+from cisco_logstore import jsonl_log
+from cisco_config import config_cache
+from cisco_bulk import BulkRunner, preset_target, parse_uris
 
 def resource_path(relative_path):
     try:
@@ -64,7 +70,7 @@ class MultiFieldDialog:
         self.result = None
         self.dialog = tk.Toplevel(parent)
         self.dialog.title(title)
-        self.dialog.geometry("400x350")
+        self.dialog.geometry(f"400x{max(350, 110 + 60 * len(fields))}")
         self.dialog.configure(bg="#121212")
         self.dialog.resizable(False, False)
         self.dialog.transient(parent)
@@ -127,6 +133,7 @@ class HomePage:
         self.sessions_file = os.path.join(self.config_dir, "sessions.json")
         self.sessions = self.load_sessions()
         self.active_sessions = []
+        phone_engine.attach(self.root)
         
         # Track popup windows
         self.ssh_manager_window = None
@@ -175,6 +182,11 @@ class HomePage:
         tk.Radiobutton(mode_frame, text="SSH Bridge", variable=self.connection_mode, value="ssh", bg="#1e1e1e", fg="#00d2ff", selectcolor="#121212", activebackground="#1e1e1e", activeforeground="white", font=("Segoe UI", 9)).pack(side="left", padx=(0, 20))
         tk.Radiobutton(mode_frame, text="Direct/Local", variable=self.connection_mode, value="local", bg="#1e1e1e", fg="#888", selectcolor="#121212", activebackground="#1e1e1e", activeforeground="white", font=("Segoe UI", 9)).pack(side="left")
         
+        tk.Label(form_f, text="TRANSPORT", bg="#1e1e1e", fg="#888", font=("Segoe UI", 7, "bold")).pack(anchor="w")
+        self.transport_combo = ttk.Combobox(form_f, values=TRANSPORT_MODES, state="readonly", font=("Segoe UI", 10))
+        self.transport_combo.set("native")
+        self.transport_combo.pack(fill="x", pady=(5, 10))
+        
         tk.Label(form_f, text="SSH CONFIG", bg="#1e1e1e", fg="#888", font=("Segoe UI", 7, "bold")).pack(anchor="w")
         ssh_frame = tk.Frame(form_f, bg="#1e1e1e")
         ssh_frame.pack(fill="x", pady=(5, 10))
@@ -208,9 +220,11 @@ class HomePage:
         tk.Label(head_f, text="PRESET DASHBOARD", bg="#121212", fg="#555", font=("Segoe UI", 10, "bold")).pack(side="left")
         
         # Management Bar (Mini buttons)
+        tk.Button(head_f, text="OPEN", bg="#121212", fg="#2980b9", font=("Segoe UI", 8, "bold"), relief="flat", cursor="hand2", command=self.open_selected_session).pack(side="right", padx=5)
         tk.Button(head_f, text="LOAD", bg="#121212", fg="#27ae60", font=("Segoe UI", 8, "bold"), relief="flat", cursor="hand2", command=self.load_preset_to_form).pack(side="right", padx=5)
         tk.Button(head_f, text="REMOVE", bg="#121212", fg="#c0392b", font=("Segoe UI", 8, "bold"), relief="flat", cursor="hand2", command=self.delete_session).pack(side="right", padx=5)
         tk.Button(head_f, text="EDIT", bg="#121212", fg="#f39c12", font=("Segoe UI", 8, "bold"), relief="flat", cursor="hand2", command=self.edit_preset).pack(side="right", padx=5)
+        tk.Button(head_f, text="BULK", bg="#121212", fg="#00d2ff", font=("Segoe UI", 8, "bold"), relief="flat", cursor="hand2", command=self.open_bulk_action).pack(side="right", padx=5)
         tk.Label(head_f, text="|", bg="#121212", fg="#333").pack(side="right", padx=5)
         tk.Button(head_f, text="▼ DN", bg="#121212", fg="#7f8c8d", font=("Segoe UI", 8, "bold"), relief="flat", cursor="hand2", command=lambda: self.move_preset(1)).pack(side="right", padx=2)
         tk.Button(head_f, text="▲ UP", bg="#121212", fg="#7f8c8d", font=("Segoe UI", 8, "bold"), relief="flat", cursor="hand2", command=lambda: self.move_preset(-1)).pack(side="right", padx=2)
@@ -237,7 +251,7 @@ class HomePage:
         self.tree.pack(fill="both", expand=True)
         self.tree.bind("<Double-1>", lambda e: self.open_selected_session())
         
-        tk.Label(right_p, text="* Double-click a row to launch immediately | Use LOAD to edit presets", bg="#121212", fg="#444", font=("Segoe UI", 8, "italic")).pack(pady=5, anchor="e")
+        tk.Label(right_p, text="* Double-click a row to launch immediately | Ctrl/Shift-click rows for OPEN or BULK | Use LOAD to edit presets", bg="#121212", fg="#444", font=("Segoe UI", 8, "italic")).pack(pady=5, anchor="e")
         
         self.refresh_tree()
 
@@ -257,9 +271,7 @@ class HomePage:
         ssh_conf_path = os.path.join(self.config_dir, "ssh.conf")
         if os.path.exists(ssh_conf_path):
             try:
-                with open(ssh_conf_path, 'r') as f:
-                    configs = json.load(f)
-                    return list(configs.keys())
+                return list(config_cache.load(ssh_conf_path).keys())
             except:
                 return ["default"]
         return ["default"]
@@ -273,8 +285,8 @@ class HomePage:
         ssh_conf_path = os.path.join(self.config_dir, "ssh.conf")
         if os.path.exists(ssh_conf_path):
             try:
-                with open(ssh_conf_path, 'r') as f:
-                    return json.load(f)
+                # A copy: the managers edit it before saving
+                return copy.deepcopy(config_cache.load(ssh_conf_path))
             except:
                 return {"default": {"host": "127.0.0.1", "user": "admin", "pass": "password"}}
         return {"default": {"host": "127.0.0.1", "user": "admin", "pass": "password"}}
@@ -283,6 +295,7 @@ class HomePage:
         ssh_conf_path = os.path.join(self.config_dir, "ssh.conf")
         with open(ssh_conf_path, 'w') as f:
             json.dump(configs, f, indent=4)
+        config_cache.invalidate(ssh_conf_path)
 
     def refresh_ssh_list(self, manager):
         self.ssh_listbox.delete(0, tk.END)
@@ -294,9 +307,7 @@ class HomePage:
         cgi_conf_path = os.path.join(self.config_dir, "cgi.conf")
         if os.path.exists(cgi_conf_path):
             try:
-                with open(cgi_conf_path, 'r') as f:
-                    configs = json.load(f)
-                    return list(configs.keys())
+                return list(config_cache.load(cgi_conf_path).keys())
             except:
                 return ["default"]
         return ["default"]
@@ -310,8 +321,8 @@ class HomePage:
         cgi_conf_path = os.path.join(self.config_dir, "cgi.conf")
         if os.path.exists(cgi_conf_path):
             try:
-                with open(cgi_conf_path, 'r') as f:
-                    return json.load(f)
+                # A copy: the managers edit it before saving
+                return copy.deepcopy(config_cache.load(cgi_conf_path))
             except:
                 return {"default": {"user": "admin", "pass": "admin"}}
         return {"default": {"user": "admin", "pass": "admin"}}
@@ -320,6 +331,7 @@ class HomePage:
         cgi_conf_path = os.path.join(self.config_dir, "cgi.conf")
         with open(cgi_conf_path, 'w') as f:
             json.dump(configs, f, indent=4)
+        config_cache.invalidate(cgi_conf_path)
 
     def refresh_cgi_list(self, manager):
         self.cgi_listbox.delete(0, tk.END)
@@ -588,16 +600,17 @@ class HomePage:
         connection_mode = self.connection_mode.get()
         ssh_config = self.ssh_combo.get() if connection_mode == "ssh" else None
         cgi_config = self.cgi_combo.get()
+        transport = self.transport_combo.get()
         if not ip: return
-        self.launch_session(ip, dtype, connection_mode, ssh_config, cgi_config)
+        self.launch_session(ip, dtype, connection_mode, ssh_config, cgi_config, transport)
 
-    def launch_session(self, ip, dtype, connection_mode, ssh_config="default", cgi_config="default"):
+    def launch_session(self, ip, dtype, connection_mode, ssh_config="default", cgi_config="default", transport="native"):
         if dtype == "8841":
-            Cisco8841Phone(self.root, ip, dtype, connection_mode, ssh_config, cgi_config)
+            Cisco8841Phone(self.root, ip, dtype, connection_mode, ssh_config, cgi_config, transport)
         elif dtype == "7911":
-            Cisco7911Phone(self.root, ip, dtype, connection_mode, ssh_config, cgi_config)
+            Cisco7911Phone(self.root, ip, dtype, connection_mode, ssh_config, cgi_config, transport)
         elif dtype == "7945":
-            Cisco7945Phone(self.root, ip, dtype, connection_mode, ssh_config, cgi_config)
+            Cisco7945Phone(self.root, ip, dtype, connection_mode, ssh_config, cgi_config, transport)
         else:
             messagebox.showerror("Unsupported Device", f"The device type '{dtype}' is not supported by this application.\n\nSupported devices: 8841, 7911, 7945")
 
@@ -607,6 +620,7 @@ class HomePage:
         connection_mode = self.connection_mode.get()
         ssh_config = self.ssh_combo.get() if connection_mode == "ssh" else None
         cgi_config = self.cgi_combo.get()
+        transport = self.transport_combo.get()
         if not ip: return
         
         fields = [
@@ -614,13 +628,15 @@ class HomePage:
             ("ip", "IP ADDRESS", ip),
             ("connection", "CONNECTION MODE", connection_mode),
             ("ssh", "SSH CONFIG", ssh_config if ssh_config else ""),
-            ("cgi", "CGI CONFIG", cgi_config)
+            ("cgi", "CGI CONFIG", cgi_config),
+            ("transport", "TRANSPORT", transport)
         ]
         
         dropdowns = {
             "connection": ["ssh", "local"],
             "ssh": self.load_ssh_configs(),
-            "cgi": self.load_cgi_configs()
+            "cgi": self.load_cgi_configs(),
+            "transport": TRANSPORT_MODES
         }
         
         dialog = MultiFieldDialog(self.root, "Save Preset", fields, dropdowns)
@@ -631,7 +647,8 @@ class HomePage:
                 "type": dtype, 
                 "connection": dialog.result["connection"],
                 "ssh": dialog.result["ssh"] if dialog.result["connection"] == "ssh" else None,
-                "cgi": dialog.result["cgi"]
+                "cgi": dialog.result["cgi"],
+                "transport": dialog.result["transport"]
             })
             self.save_sessions()
             self.refresh_tree()
@@ -653,19 +670,22 @@ class HomePage:
         connection_mode = sess.get('connection', 'ssh')  # Default to ssh for backward compatibility
         ssh_config = sess.get('ssh', 'default') if connection_mode == 'ssh' else ''
         cgi_config = sess.get('cgi', 'default')
+        transport = sess.get('transport', 'native')
         
         fields = [
             ("name", "PRESET NAME", sess['name']),
             ("ip", "IP ADDRESS", sess['ip']),
             ("connection", "CONNECTION MODE", connection_mode),
             ("ssh", "SSH CONFIG", ssh_config),
-            ("cgi", "CGI CONFIG", cgi_config)
+            ("cgi", "CGI CONFIG", cgi_config),
+            ("transport", "TRANSPORT", transport)
         ]
         
         dropdowns = {
             "connection": ["ssh", "local"],
             "ssh": self.load_ssh_configs(),
-            "cgi": self.load_cgi_configs()
+            "cgi": self.load_cgi_configs(),
+            "transport": TRANSPORT_MODES
         }
         
         dialog = MultiFieldDialog(self.root, "Edit Preset", fields, dropdowns)
@@ -676,20 +696,82 @@ class HomePage:
                 "type": sess['type'], 
                 "connection": dialog.result["connection"],
                 "ssh": dialog.result["ssh"] if dialog.result["connection"] == "ssh" else None,
-                "cgi": dialog.result["cgi"]
+                "cgi": dialog.result["cgi"],
+                "transport": dialog.result["transport"]
             }
             self.save_sessions()
             self.refresh_tree()
 
     def open_selected_session(self):
+        # Every selected preset opens at once; each window connects in the background, in parallel
+        for iid in self.tree.selection():
+            sess = self.sessions[int(iid)]
+            connection_mode = sess.get('connection', 'ssh')
+            ssh_config = sess.get('ssh', 'default') if connection_mode == 'ssh' else None
+            cgi_config = sess.get('cgi', 'default')
+            transport = sess.get('transport', 'native')
+            self.launch_session(sess['ip'], sess['type'], connection_mode, ssh_config, cgi_config, transport)
+
+    def open_bulk_action(self):
         selected = self.tree.selection()
-        if not selected: return
-        idx = int(selected[0])
-        sess = self.sessions[idx]
-        connection_mode = sess.get('connection', 'ssh')
-        ssh_config = sess.get('ssh', 'default') if connection_mode == 'ssh' else None
-        cgi_config = sess.get('cgi', 'default')
-        self.launch_session(sess['ip'], sess['type'], connection_mode, ssh_config, cgi_config)
+        if not selected:
+            messagebox.showerror("Selection Required", "Please select one or more presets (Ctrl/Shift-click) to run a bulk action on.")
+            return
+        targets = [preset_target(self.sessions[int(i)]) for i in selected]
+        keys = simpledialog.askstring("Bulk Action", f"Key URIs to send to {len(targets)} phone(s), comma separated\n(e.g. Key:Settings,Key:KeyPad4):", parent=self.root)
+        if not keys:
+            return
+        uris = parse_uris(keys)
+        runner = BulkRunner()
+
+        win = tk.Toplevel(self.root)
+        win.title("Bulk Action")
+        win.geometry("420x130")
+        win.configure(bg="#121212")
+        status = tk.Label(win, text=f"0/{len(targets)} phones done", bg="#121212", fg="#00d2ff", font=("Segoe UI", 10, "bold"))
+        status.pack(anchor="w", padx=10, pady=(10, 5))
+        bar = ttk.Progressbar(win, maximum=len(targets), length=400)
+        bar.pack(padx=10)
+        cancel_btn = tk.Button(win, text="CANCEL", bg="#333", fg="white", relief="flat")
+        cancel_btn.pack(pady=10)
+        def _cancel():
+            runner.cancel()
+            cancel_btn.config(state="disabled")
+            status.config(text="Cancelling, waiting for requests in flight...")
+        cancel_btn.config(command=_cancel)
+        win.protocol("WM_DELETE_WINDOW", _cancel)
+
+        done = [0]
+        def _progress(result):
+            done[0] += 1
+            if win.winfo_exists():
+                bar["value"] = done[0]
+                if not runner.cancelled.is_set():
+                    status.config(text=f"{done[0]}/{len(targets)} phones done, last {result['ip']}: {'ok' if result['ok'] else result['error']}")
+        def _finished(results):
+            if win.winfo_exists():
+                win.destroy()
+            self.show_bulk_results(uris, results)
+        # Its own thread, so a long run never occupies the pools the open phone windows poll with
+        def _run():
+            results = runner.run(targets, uris, lambda r: phone_engine.post(_progress, r))
+            phone_engine.post(_finished, results)
+        threading.Thread(target=_run, daemon=True, name="bulk").start()
+
+    def show_bulk_results(self, uris, results):
+        win = tk.Toplevel(self.root)
+        win.title("Bulk Action Results")
+        win.geometry("900x400")
+        win.configure(bg="#121212")
+        ok = sum(1 for r in results if r["ok"])
+        tk.Label(win, text=f"{', '.join(uris)}  —  {ok}/{len(results)} phones succeeded", bg="#121212", fg="#00d2ff", font=("Segoe UI", 10, "bold")).pack(anchor="w", padx=10, pady=10)
+        tree = ttk.Treeview(win, columns=("Name", "IP", "OK", "Latency", "Tries", "Detail"), show="headings")
+        for col, width in (("Name", 120), ("IP", 110), ("OK", 40), ("Latency", 70), ("Tries", 50), ("Detail", 480)):
+            tree.heading(col, text=f" {col.upper()}")
+            tree.column(col, width=width, anchor="w" if col in ("Name", "Detail") else "center")
+        for r in results:
+            tree.insert("", "end", values=(r["name"], r["ip"], "yes" if r["ok"] else "NO", f"{r['latency_ms']} ms", r["attempts"], r["error"] or r["response"]))
+        tree.pack(fill="both", expand=True, padx=10, pady=(0, 10))
 
     def load_preset_to_form(self):
         selected = self.tree.selection()
@@ -710,6 +792,7 @@ class HomePage:
             self.ssh_combo.set(sess.get('ssh', 'default'))
         
         self.cgi_combo.set(sess.get('cgi', 'default'))
+        self.transport_combo.set(sess.get('transport', 'native'))
         
         messagebox.showinfo("Preset Loaded", f"Preset '{sess['name']}' loaded into form fields. You can now modify and launch.")
 
@@ -732,9 +815,15 @@ class HomePage:
         
         if self.active_sessions:
             if messagebox.askyesno("Confirm Exit", f"There are {len(self.active_sessions)} active sessions. Still want to close the manager?"):
-                self.root.destroy()
+                self.shutdown()
         else:
-            self.root.destroy()
+            self.shutdown()
+
+    def shutdown(self):
+        phone_engine.stop()
+        ssh_pool.close_all()
+        jsonl_log.stop()
+        self.root.destroy()
 
 if __name__ == "__main__":
     root = tk.Tk()